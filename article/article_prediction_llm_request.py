@@ -5,11 +5,19 @@ import logging
 import time
 import boto3
 import uuid
-from collections import defaultdict
+from botocore.config import Config
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime, timezone, timedelta
 from google import genai
 from google.genai import types
 
+try:
+    import orjson
+except ImportError: # orjson이 Lambda Layer에 없는 환경에서는 표준 json 사용
+    orjson = None
+
 # --- 설정 및 초기화 ---
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
@@ -18,14 +26,48 @@ logger.setLevel(logging.DEBUG)
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 PREDICTION_SQS_QUEUE_URL = os.environ.get('PREDICTION_SQS_QUEUE_URL')
 
-# 클라이언트 초기화
-sqs_client = boto3.client('sqs')
-ssm_client = boto3.client('ssm')
+# 티커 목록은 자주 바뀌지 않으므로 웜 컨테이너에서는 TTL 동안 재조회하지 않음
+TICKER_CACHE_TTL_SECONDS = 900
+# SQS 배치 전송 동시 실행 수
+SQS_SEND_MAX_WORKERS = 10
+# Gemini 1회 호출당 헤드라인 수 및 동시 호출 수 (Rate Limit 고려)
+GEMINI_CHUNK_SIZE = 50
+GEMINI_MAX_WORKERS = 4
+
+# 클라이언트 초기화 (하나의 세션/자격 증명 캐시를 공유하고, 웜 컨테이너에서 커넥션 재사용)
+_boto_session = boto3.session.Session()
+_boto_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50, # 배치 병렬 전송 시 커넥션 풀 부족 방지
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+)
+sqs_client = _boto_session.client('sqs', config=_boto_config)
+ssm_client = _boto_session.client('ssm', config=_boto_config)
 client = genai.Client(api_key=GEMINI_API_KEY)
 
+# 호출 간 재사용되는 (ticker_map, ticker_context_str) 캐시
+_ticker_cache = {'data': None, 'fetched_at': 0.0}
+
+
+def to_json(obj):
+    """SQS MessageBody용 JSON 문자열을 생성합니다. (orjson 우선 사용)"""
+    if orjson:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+
+def from_json(data):
+    """JSON 문자열을 파싱합니다. (orjson 우선 사용)"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 def get_tickers_from_parameter_store():
-    """Parameter Store에서 저장된 티커 목록을 가져옵니다."""
+    """Parameter Store에서 저장된 티커 목록을 가져옵니다. 캐시가 유효하면 조회를 생략합니다."""
+    if _ticker_cache['data'] and time.monotonic() - _ticker_cache['fetched_at'] < TICKER_CACHE_TTL_SECONDS:
+        return _ticker_cache['data']
+
     logger.info("Fetching tickers from Parameter Store.")
     try:
         response = ssm_client.get_parameters(
@@ -37,7 +79,7 @@ def get_tickers_from_parameter_store():
         # 성공적으로 조회된 파라미터들을 순회하며 하나의 리스트로 병합합니다.
         for param in response.get('Parameters', []):
             try:
-                cached_data = json.loads(param['Value'])
+                cached_data = from_json(param['Value'])
                 all_tickers.extend(cached_data.get('tickers', []))
             except json.JSONDecodeError:
                 logger.error(f"Failed to parse JSON for parameter: {param.get('Name')}")
@@ -58,8 +100,12 @@ def get_tickers_from_parameter_store():
             
             ticker_map[t_code] = t_id
             ticker_desc_list.append(f"{t_code}({t_name})")
-            
-        return ticker_map, ", ".join(ticker_desc_list)
+
+        result = (ticker_map, ", ".join(ticker_desc_list))
+        if ticker_map:
+            _ticker_cache['data'] = result
+            _ticker_cache['fetched_at'] = time.monotonic()
+        return result
     except Exception as e:
         logger.exception("Failed to get tickers.")
         return {}, ""
@@ -71,12 +117,11 @@ def call_gemini_model_with_clustering(articles, ticker_context_str):
     """
     
     # 1. 입력 데이터 텍스트화
-    articles_text = ""
-    for idx, art in enumerate(articles, 1):
-        headline = art.get('headline', 'N/A')
-        symbol_hint = art.get('symbol', '')
-        # 뉴스 ID나 인덱스를 주어 LLM이 식별하기 편하게 함
-        articles_text += f"[{idx}] (SymbolHint: {symbol_hint}) {headline}\n"
+    # 뉴스 ID나 인덱스를 주어 LLM이 식별하기 편하게 함 (문자열 += 반복 대신 join으로 한 번에 생성)
+    articles_text = "".join(
+        f"[{idx}] (SymbolHint: {art.get('symbol', '')}) {art.get('headline', 'N/A')}\n"
+        for idx, art in enumerate(articles, 1)
+    )
 
     # 2. 응답 스키마 정의 (Semantic Grouping)
     response_schema = types.Schema(
@@ -141,28 +186,45 @@ def call_gemini_model_with_clustering(articles, ticker_context_str):
         logger.error(f"Gemini API Error: {e}")
         return []
 
+def cluster_articles_in_chunks(articles, ticker_context_str):
+    """
+    헤드라인을 GEMINI_CHUNK_SIZE 단위로 나누어 클러스터링을 병렬 호출하고 결과를 합칩니다.
+    실패한 청크는 빈 결과로 처리되므로 성공한 청크의 결과만으로 집계가 계속됩니다.
+    (같은 사건이 여러 청크에 나뉘어도 종목별 집계 단계에서 합산됨)
+    """
+    chunks = [articles[i:i + GEMINI_CHUNK_SIZE] for i in range(0, len(articles), GEMINI_CHUNK_SIZE)]
+    with ThreadPoolExecutor(max_workers=GEMINI_MAX_WORKERS) as executor:
+        results = executor.map(lambda chunk: call_gemini_model_with_clustering(chunk, ticker_context_str), chunks)
+        return [cluster for clusters in results for cluster in clusters]
+
+def send_entries_chunk(entries):
+    """10개 이하의 엔트리를 한 번의 배치로 전송합니다. 실패는 로그로만 남깁니다."""
+    try:
+        response = sqs_client.send_message_batch(
+            QueueUrl=PREDICTION_SQS_QUEUE_URL,
+            Entries=entries
+        )
+        failed = response.get('Failed', [])
+        if failed:
+            logger.error(f"SQS Batch Partial Failure: {len(failed)} messages failed. {failed}")
+        logger.info(f"Sent {len(entries) - len(failed)} aggregated messages to SQS.")
+    except Exception as e:
+        logger.error(f"SQS Send Error: {e}")
+
+def iter_batches(iterable, size=10):
+    """이터러블을 size개 단위 리스트로 지연 분할합니다. (중간 리스트/슬라이스 생성 없이 순회)"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
 def send_batch_to_sqs(messages):
-    """SQS 배치 전송"""
+    """SQS 배치 전송 (배치 간 병렬 전송)"""
     if not messages:
         return
     
-    chunk_size = 10
-    for i in range(0, len(messages), chunk_size):
-        chunk = messages[i:i + chunk_size]
-        entries = []
-        for msg in chunk:
-            entries.append({
-                'Id': str(uuid.uuid4()),
-                'MessageBody': json.dumps(msg)
-            })
-        try:
-            sqs_client.send_message_batch(
-                QueueUrl=PREDICTION_SQS_QUEUE_URL,
-                Entries=entries
-            )
-            logger.info(f"Sent {len(entries)} aggregated messages to SQS.")
-        except Exception as e:
-            logger.error(f"SQS Send Error: {e}")
+    entries = ({'Id': str(uuid.uuid4()), 'MessageBody': to_json(msg)} for msg in messages)
+    with ThreadPoolExecutor(max_workers=SQS_SEND_MAX_WORKERS) as executor:
+        list(executor.map(send_entries_chunk, iter_batches(entries)))
 
 def lambda_handler(event, context):
     """
@@ -180,11 +242,11 @@ def lambda_handler(event, context):
     unique_articles = {}
     for record in event.get('Records', []):
         try:
-            body = json.loads(record['body'])
+            body = from_json(record['body'])
             headline = body.get('headline')
-            # 완전히 똑같은 문장의 기사는 LLM에 보낼 필요도 없이 여기서 1차 필터링
-            if headline and headline not in unique_articles:
-                unique_articles[headline] = body
+            # 완전히 똑같은 문장의 기사는 LLM에 보낼 필요도 없이 여기서 1차 필터링 (먼저 들어온 기사 유지)
+            if headline:
+                unique_articles.setdefault(headline, body)
         except json.JSONDecodeError:
             continue
     
@@ -195,12 +257,14 @@ def lambda_handler(event, context):
 
     # 2. Gemini 클러스터링 & 분석 호출
     logger.info(f"Clustering and Analyzing {len(articles_list)} unique headlines...")
-    clustered_results = call_gemini_model_with_clustering(articles_list, ticker_context_str)
+    clustered_results = cluster_articles_in_chunks(articles_list, ticker_context_str)
     
     # 3. 결과 집계 (Aggregation)
     # Gemini가 묶어준 Cluster 단위로 점수를 합산합니다.
     # 예: A클러스터(긍정, 3개) + B클러스터(긍정, 2개) -> AAPL 긍정 5개
-    aggregation = defaultdict(lambda: {'positive': 0, 'negative': 0, 'neutral': 0})
+    # 감정별로 종목 코드 -> 기사 수 Counter를 따로 두어 중첩 dict 생성/조회를 피함
+    positive_counts, negative_counts, neutral_counts = Counter(), Counter(), Counter()
+    counts_by_sentiment = {'POSITIVE': positive_counts, 'NEGATIVE': negative_counts}
     
     for cluster in clustered_results:
         code = cluster.get('ticker_code')
@@ -208,19 +272,14 @@ def lambda_handler(event, context):
         count = cluster.get('article_count', 1) # LLM이 카운팅한 개수 반영
         
         if code in ticker_map and sentiment:
-            if sentiment == 'POSITIVE':
-                aggregation[code]['positive'] += count
-            elif sentiment == 'NEGATIVE':
-                aggregation[code]['negative'] += count
-            else:
-                aggregation[code]['neutral'] += count
+            counts_by_sentiment.get(sentiment, neutral_counts)[code] += count
 
     # 4. SQS 메시지 생성
     sqs_messages = []
     prediction_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
     current_time_iso = datetime.now(timezone.utc).isoformat()
 
-    for ticker_code, counts in aggregation.items():
+    for ticker_code in positive_counts.keys() | negative_counts.keys() | neutral_counts.keys():
         ticker_id = ticker_map.get(ticker_code)
         
         if not ticker_id:
@@ -230,17 +289,17 @@ def lambda_handler(event, context):
             'tickerId': ticker_id,
             'type': 'article',
             'payload': {
-                'positiveArticleCount': counts['positive'],
-                'negativeArticleCount': counts['negative'],
-                'neutralArticleCount': counts['neutral'],
+                'positiveArticleCount': positive_counts[ticker_code],
+                'negativeArticleCount': negative_counts[ticker_code],
+                'neutralArticleCount': neutral_counts[ticker_code],
                 'predictionDate': prediction_date,
                 'createdAt': current_time_iso
             }
         }
         if ticker_code in ['NVDA','AMD','DIS']:
-            logger.debug(f"positive_article_count: {counts['positive']}, \
-                negative_article_count: {counts['negative']}, \
-                neutral_article_count: {counts['neutral']}")
+            logger.debug(f"positive_article_count: {positive_counts[ticker_code]}, \
+                negative_article_count: {negative_counts[ticker_code]}, \
+                neutral_article_count: {neutral_counts[ticker_code]}")
         sqs_messages.append(message_body)
 
     if sqs_messages:
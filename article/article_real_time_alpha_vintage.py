@@ -3,7 +3,9 @@ import json
 import logging
 import uuid
 import boto3
+from botocore.config import Config
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 
 # --- 설정 및 초기화 ---
@@ -13,19 +15,31 @@ logger.setLevel(logging.INFO)
 ALPHA_VINTAGE_API_KEY = os.environ.get('ALPHA_VINTAGE_API_KEY')
 PREDICTION_LLM_QUEUE_URL = os.environ.get('PREDICTION_LLM_QUEUE_URL')
 
-sqs_client = boto3.client('sqs')
+sqs_client = boto3.client('sqs', config=Config(
+    tcp_keepalive=True,
+    max_pool_connections=50, # 배치 동시 전송을 위한 커넥션 풀
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+))
 
 # 한 번에 가져올 최대 뉴스 개수 (API 파라미터)
 API_FETCH_LIMIT = 300
 # SQS 배치 전송 크기 (AWS 제한)
 SQS_BATCH_SIZE = 10
+# 동시에 전송 중(in-flight)일 수 있는 SQS 배치 수
+SQS_SEND_MAX_WORKERS = 10
 
 def format_av_datetime(av_time_str):
-    """Alpha Vantage 시간 포맷 변환 (YYYYMMDDTHHMM -> ISO 8601)"""
+    """Alpha Vantage 시간 포맷 변환 (YYYYMMDDTHHMM[SS] -> ISO 8601)"""
+    # 고정 길이 포맷이므로 strptime 대신 위치 슬라이싱으로 파싱
+    if len(av_time_str) not in (13, 15) or av_time_str[8] != 'T':
+        return av_time_str
     try:
-        dt_obj = datetime.strptime(av_time_str, '%Y%m%dT%H%M')
+        dt_obj = datetime(
+            int(av_time_str[0:4]), int(av_time_str[4:6]), int(av_time_str[6:8]),
+            int(av_time_str[9:11]), int(av_time_str[11:13]), int(av_time_str[13:15] or 0)
+        )
         return dt_obj.isoformat()
-    except Exception:
+    except ValueError:
         return av_time_str
 
 def fetch_market_news():
@@ -66,10 +80,13 @@ def send_sqs_batch(entries):
     if not entries:
         return
     try:
-        sqs_client.send_message_batch(
+        response = sqs_client.send_message_batch(
             QueueUrl=PREDICTION_LLM_QUEUE_URL,
             Entries=entries
         )
+        failed = len(response.get('Failed', []))
+        if failed > 0:
+            logger.error(f"SQS Batch Partial Failure: {failed} messages failed.")
     except Exception as e:
         logger.exception("Critical error sending SQS batch.")
 
@@ -87,37 +104,39 @@ def lambda_handler(event, context):
 
     total_queued = 0
     sqs_buffer = []
-
-    # 2. 결과 처리
-    for article in news_list:
-        headline = article.get('title')
-        if not headline:
-            continue
-
-        raw_time = article.get('time_published')
-        formatted_time = format_av_datetime(raw_time) if raw_time else datetime.now(timezone.utc).isoformat()
-
-        # [중요] 특정 종목 쿼리가 아니므로 Symbol은 'Market' 등 일반적인 값으로 설정
-        # LLM이 헤드라인을 분석하여 실제 종목을 추출할 것이므로 문제는 없음
-        payload = {
-            'headline': headline,
-            'symbol': 'Market', 
-            'datetime': formatted_time
-        }
-
-        entry = {
-            'Id': str(uuid.uuid4()),
-            'MessageBody': json.dumps(payload),
-        }
-        sqs_buffer.append(entry)
-        total_queued += 1
-
-        if len(sqs_buffer) >= SQS_BATCH_SIZE:
-            send_sqs_batch(sqs_buffer)
-            sqs_buffer = []
-
-    if sqs_buffer:
-        send_sqs_batch(sqs_buffer)
+    # 버퍼가 찰 때마다 배치를 백그라운드로 전송하여 여러 배치가 동시에 전송되도록 함
+    # with 블록을 벗어날 때(예외 포함) 진행 중인 전송이 모두 끝날 때까지 대기
+    with ThreadPoolExecutor(max_workers=SQS_SEND_MAX_WORKERS) as send_executor:
+        # 2. 결과 처리
+        for article in news_list:
+            headline = article.get('title')
+            if not headline:
+                continue
+
+            raw_time = article.get('time_published')
+            formatted_time = format_av_datetime(raw_time) if raw_time else datetime.now(timezone.utc).isoformat()
+
+            # [중요] 특정 종목 쿼리가 아니므로 Symbol은 'Market' 등 일반적인 값으로 설정
+            # LLM이 헤드라인을 분석하여 실제 종목을 추출할 것이므로 문제는 없음
+            payload = {
+                'headline': headline,
+                'symbol': 'Market', 
+                'datetime': formatted_time
+            }
+
+            entry = {
+                'Id': str(uuid.uuid4()),
+                'MessageBody': json.dumps(payload),
+            }
+            sqs_buffer.append(entry)
+            total_queued += 1
+
+            if len(sqs_buffer) >= SQS_BATCH_SIZE:
+                send_executor.submit(send_sqs_batch, sqs_buffer)
+                sqs_buffer = []
+
+        if sqs_buffer:
+            send_executor.submit(send_sqs_batch, sqs_buffer)
 
     logger.info(f"Done. Queued {total_queued} headlines from Alpha Vantage (Single Call).")
     return {"statusCode": 200, "body": "Success"}
\ No newline at end of file
@@ -1,16 +1,27 @@
 import os
 import json
+import gzip
+import base64
 import logging
 import boto3
+from botocore.config import Config
 from datetime import datetime, timedelta, timezone
 from supabase import create_client, Client
 from polygon import RESTClient
+from polygon.exceptions import AuthError, BadResponse
+import urllib3
 import pytz
 import time
 import concurrent.futures 
 from collections import defaultdict
+from itertools import islice
 from difflib import SequenceMatcher
 
+try:
+    import orjson
+except ImportError: # orjson이 Lambda Layer에 없는 환경에서는 표준 json 사용
+    orjson = None
+
 # --- 로거, 환경 변수, 클라이언트 초기화 ---
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -21,14 +32,84 @@ PREDICTION_SQS_QUEUE_URL = os.environ.get('PREDICTION_SQS_QUEUE_URL')
 SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
 
+# 이 크기(bytes) 이상의 아티클 메시지만 gzip 압축 (작은 메시지는 압축 이득보다 오버헤드가 큼)
+COMPRESSION_THRESHOLD_BYTES = 1024
+# 티커 목록은 자주 바뀌지 않으므로 웜 컨테이너에서는 TTL 동안 재조회하지 않음
+TICKER_CACHE_TTL_SECONDS = 900
+# SQS 배치 전송 동시 실행 수
+SQS_SEND_MAX_WORKERS = 10
+SEOUL_TZ = pytz.timezone("Asia/Seoul")
+# FIFO 큐인 경우 아티클 ID 기반 중복 제거를 SQS(5분 윈도우)에 위임
+ARTICLE_QUEUE_IS_FIFO = (ARTICLE_SQS_QUEUE_URL or '').endswith('.fifo')
+
 # 클라이언트는 핸들러 함수 밖에 선언하여 재사용 (성능 최적화)
-sqs_client = boto3.client('sqs')
-ssm_client = boto3.client('ssm')
+# 병렬 배치 전송 시 커넥션 풀이 부족하지 않도록 하고, 웜 컨테이너에서 TCP/TLS 연결을 재사용
+AWS_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    tcp_keepalive=True
+)
+sqs_client = boto3.client('sqs', config=AWS_CLIENT_CONFIG)
+ssm_client = boto3.client('ssm', config=AWS_CLIENT_CONFIG)
 polygon_client = RESTClient(POLYGON_API_KEY)
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 translate_client = boto3.client('translate') 
 
+# 호출 간 재사용되는 티커 목록 캐시 (지원 티커 코드 frozenset 포함)
+_ticker_cache = {'data': None, 'supported': frozenset(), 'fetched_at': 0.0}
+
+def to_json(obj):
+    """SQS MessageBody용 JSON 문자열을 생성합니다. (orjson 우선 사용)"""
+    if orjson:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+def build_article_body_suffix(is_market_open, created_at):
+    """모든 아티클 메시지에 공통인 필드(is_market_open, created_at)를 실행당 한 번만 JSON 인코딩합니다."""
+    return ',"is_market_open":' + to_json(is_market_open) + ',"created_at":' + to_json(created_at) + '}'
+
+def build_article_entry(entry_id, article, body_suffix):
+    """
+    아티클 메시지용 SQS 배치 엔트리를 생성합니다. (본문: {'article', 'is_market_open', 'created_at'})
+    임계값 이상의 페이로드는 gzip 압축 후 base64로 인코딩하고, 'encoding' 속성으로 표시합니다.
+    FIFO 큐라면 아티클 ID를 중복 제거 ID로, 대표 티커(없으면 'GENERAL')를 메시지 그룹으로 지정합니다.
+    """
+    body = '{"article":' + to_json(article) + body_suffix # 공통 필드는 미리 인코딩된 suffix 재사용
+    raw = body.encode('utf-8')
+    if len(raw) < COMPRESSION_THRESHOLD_BYTES:
+        entry = {'Id': entry_id, 'MessageBody': body}
+    else:
+        entry = {
+            'Id': entry_id,
+            'MessageBody': base64.b64encode(gzip.compress(raw, compresslevel=1)).decode('ascii'),
+            'MessageAttributes': {'encoding': {'DataType': 'String', 'StringValue': 'gzip+base64'}}
+        }
+
+    if ARTICLE_QUEUE_IS_FIFO:
+        insights = article.get('insights')
+        entry['MessageGroupId'] = insights[0]['ticker_code'] if insights else 'GENERAL'
+        entry['MessageDeduplicationId'] = entry_id
+    return entry
+
+def iter_batches(iterable, size=10):
+    """이터러블을 size개 단위 리스트로 지연 분할합니다. (중간 리스트/슬라이스 생성 없이 순회)"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def send_entries_to_sqs(queue_url, entries):
+    """엔트리(이터러블)를 10개 단위 배치로 나누어 SQS로 동시에 전송합니다. 부분 실패한 메시지는 로그로 남깁니다."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=SQS_SEND_MAX_WORKERS) as executor:
+        responses = list(executor.map(
+            lambda batch: sqs_client.send_message_batch(QueueUrl=queue_url, Entries=batch),
+            iter_batches(entries)
+        ))
+
+    failed = [entry for response in responses for entry in response.get('Failed', [])]
+    if failed:
+        logger.error("Failed to send %d messages to %s: %s", len(failed), queue_url, failed)
+
 def get_tickers_from_parameter_store():
     """Parameter Store에서 저장된 티커 목록을 가져옵니다."""
     logger.info("Fetching tickers from Parameter Store.")
@@ -79,6 +160,24 @@ def get_tickers_from_supabase():
         logger.exception("Failed to fetch tickers from Supabase.")
     return []
 
+def get_tickers():
+    """
+    티커 목록과 지원 티커 코드 집합(frozenset)을 반환합니다.
+    캐시가 유효하면 Parameter Store/DB 조회를 생략합니다.
+    """
+    if _ticker_cache['data'] and time.monotonic() - _ticker_cache['fetched_at'] < TICKER_CACHE_TTL_SECONDS:
+        return _ticker_cache['data'], _ticker_cache['supported']
+
+    tickers = get_tickers_from_parameter_store() # 선 파라미터 조회
+    if tickers is None:
+        tickers = get_tickers_from_supabase() # 안전장치로 db에서 조회
+    supported = frozenset(ticker[1] for ticker in tickers)
+    if tickers:
+        _ticker_cache['data'] = tickers
+        _ticker_cache['supported'] = supported
+        _ticker_cache['fetched_at'] = time.monotonic()
+    return tickers, supported
+
 def get_market_status():
     """Polygon API를 호출하여 현재 시장 상태가 'OPEN'인지 여부를 반환합니다."""
     try:
@@ -110,8 +209,12 @@ def fetch_articles(published_utc_gte, ticker_code, limit):
             )
         if response:
             return list(response)
-    except Exception as e:
+    except (BadResponse, AuthError, urllib3.exceptions.HTTPError, TimeoutError, ValueError) as e:
+        # Polygon 응답/네트워크/파싱(JSONDecodeError 포함) 오류는 빈 결과로 처리
         logger.error("Polygon news API failed for ticker %s: %s", ticker_code or "ALL", e)
+    except Exception:
+        # 예상하지 못한 오류도 수집 전체를 중단시키지 않도록 스택과 함께 기록하고 빈 결과 반환
+        logger.exception("Unexpected error while fetching Polygon news for ticker %s", ticker_code or "ALL")
     return []
 
 def deduplicate_articles(articles, similarity_threshold=0.7):
@@ -129,7 +232,7 @@ def deduplicate_articles(articles, similarity_threshold=0.7):
     deduplicated_articles = []
     
     for new_article in articles:
-        if not hasattr(new_article, 'title') or not new_article.title:
+        if not new_article.title:
             # 제목이 없는 아티클은 건너뜁니다.
             continue
         
@@ -171,6 +274,38 @@ def add_news_count_for_sentiment(insight, ticker, sentiment_stats):
         sentiment_stats[ticker]["neutral"] += 1
 
 
+def build_article_payload(article, ticker_info_map, supported_tickers_set, sentiment_stats):
+    """
+    Polygon 아티클 하나를 SQS 전송용 페이로드로 변환합니다.
+    지원 티커만 남긴 tickers/insights를 담고, 지원 티커의 감정 count(sentiment_stats)를 갱신합니다.
+    """
+    # 우리 서비스에서 지원하는 티커여야함 (기사 내 티커 순서 유지)
+    ticker_names = [ticker_info_map[ticker_code]['name'] for ticker_code in article.tickers
+                    if ticker_code in supported_tickers_set]
+
+    # insights 필터링 (지원 티커가 하나도 없는 기사는 순회 생략)
+    insights = []
+    if not supported_tickers_set.isdisjoint(insight.ticker for insight in article.insights):
+        for insight in article.insights:
+            ticker_code = insight.ticker
+            if ticker_code in supported_tickers_set:
+                insights.append({
+                    "ticker_code" : ticker_code,
+                    "sentiment" : insight.sentiment,
+                    "reasoning" : insight.sentiment_reasoning
+                })
+                add_news_count_for_sentiment(insight, ticker_code, sentiment_stats) # 뉴스 감정 count 업데이트
+
+    # 모든 키를 한 번에 담아 생성 (TickerNews 모델은 선택 필드를 None 기본값으로 가지므로 getattr 불필요)
+    return {
+        'published_date': article.published_utc, 'title': article.title,
+        'description': article.description, 'article_url': article.article_url,
+        'thumbnail_url': article.image_url, 'author': article.author,
+        'distinct_id' : article.id,
+        'tickers': ticker_names or None,
+        'insights': insights
+    }
+
 def translate_payload(payload):
     try:
         # 1. 제목 번역
@@ -220,8 +355,17 @@ def lambda_handler(event, context):
     logger.info("Article collection Lambda handler started.")
     
     try:
-        is_market_open = get_market_status()
-        current_utc_time = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        # 시장 상태 조회와 티커 목록 조회는 서로 독립적인 네트워크 호출이므로 동시에 수행
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            market_status_future = executor.submit(get_market_status)
+            tickers_future = executor.submit(get_tickers)
+            is_market_open = market_status_future.result()
+            tickers, supported_tickers_set = tickers_future.result()
+
+        # 실행 시각은 한 번만 조회하고, 이후의 모든 시각 값은 여기서 파생 (한 번의 실행 = 하나의 생성 시각)
+        now_utc = datetime.now(timezone.utc)
+        created_at = now_utc.astimezone(SEOUL_TZ).isoformat()
+        current_utc_time = now_utc.replace(second=0, microsecond=0)
         if is_market_open:
             published_utc_gte = (current_utc_time - timedelta(hours=1)) \
             .strftime('%Y-%m-%dT%H:%M:%SZ') # created_at이 아닌 published_date gt 조건이므로, 좀 넉넉하게 범위를 잡아야함
@@ -231,14 +375,10 @@ def lambda_handler(event, context):
         logger.info("Will fetch article %s ~ %s of UTC", published_utc_gte, 
                     current_utc_time.strftime('%Y-%m-%dT%H:%M:%SZ'))
         
-        prediction_date = datetime.now(timezone.utc) \
+        prediction_date = now_utc \
             .replace(hour=0, minute=0, second=0, microsecond=0) # 데이터 간 날짜 통일을 위해 사용
         
-        tickers = get_tickers_from_parameter_store() # 선 파라미터 조회
-        if tickers is None:
-            tickers = get_tickers_from_supabase() # 안전장치로 db에서 조회
         ticker_info_map = { ticker[1]: {'id': ticker[0], 'name': ticker[2]} for ticker in tickers }
-        supported_tickers_set = set(ticker[1] for ticker in tickers)
         
         # 1. 전체 최신 뉴스 수집
         logger.info("Fetching general articles...")
@@ -252,46 +392,14 @@ def lambda_handler(event, context):
         logger.info(f"Deduplication complete. Removed {initial_count - deduplicated_count} articles. "
                     f"Processing {deduplicated_count} unique articles.")
         
-        articles_to_send = []
         # 티커별 sentiment_news_count
         sentiment_stats = defaultdict(lambda: {"positive": 0, "negative": 0, "neutral": 0})
         
         # 2. 아티클별 페이로드 생성
-        for article in articles_to_process:
-            # ⭐️ 공통 페이로드 생성 (티커, 감정 정보 제외)
-            payload = {
-                'published_date': article.published_utc, 'title': article.title,
-                'description': article.description, 'article_url': article.article_url,
-                'thumbnail_url': getattr(article, 'image_url', None), 'author': article.author,
-                'distinct_id' : article.id
-            }
-            
-            # tickers(code) 필터링 및 추가
-            tickers = []
-            for ticker_code in article.tickers:
-                 if ticker_code in supported_tickers_set: # 우리 서비스에서 지원하는 티커여야함
-                     tickers.append(ticker_info_map.get(ticker_code, {}).get('name'))
-            if tickers:
-                payload['tickers'] = tickers
-            else:
-                payload['tickers'] = None
-                
-            # insights 필터링 및 추가
-            insights = []
-            for insight in article.insights:
-                ticker_code = insight.ticker
-                sentiemnt = insight.sentiment
-                reasoning = insight.sentiment_reasoning
-                if ticker_code in supported_tickers_set:
-                    insights.append({
-                        "ticker_code" : ticker_code,
-                        "sentiment" : sentiemnt,
-                        "reasoning" : reasoning
-                    })
-                    add_news_count_for_sentiment(insight, ticker_code, sentiment_stats) # 뉴스 감정 count 업데이트
-            payload['insights'] = insights
-            
-            articles_to_send.append(payload)
+        articles_to_send = [
+            build_article_payload(article, ticker_info_map, supported_tickers_set, sentiment_stats)
+            for article in articles_to_process
+        ]
 
         # 3. 수집된 뉴스를 SQS 큐로 전송
         if not articles_to_send:
@@ -318,23 +426,18 @@ def lambda_handler(event, context):
             logger.info("Sending %d unique articles to SQS queue...",
                 len(articles_to_send))
             
-            entries_to_send = []
-            for article in articles_to_send:
-                message_body = {
-                    'article': article,
-                    'is_market_open': is_market_open,
-                    'created_at': datetime.now(pytz.timezone("Asia/Seoul")).isoformat()
-                }
-                distinct_id = article['distinct_id']
-                entries_to_send.append({
-                    'Id': distinct_id.replace('.', '-'), # SQS ID에 '.' 허용 안됨
-                    'MessageBody': json.dumps(message_body)
-                })
+            # 번역된 payload를 복사 없이 그대로 메시지 본문에 담고, 엔트리는 배치 단위로 지연 생성
+            body_suffix = build_article_body_suffix(is_market_open, created_at)
+            entries_to_send = (
+                build_article_entry(
+                    article['distinct_id'].replace('.', '-'), # SQS ID에 '.' 허용 안됨
+                    article, body_suffix
+                )
+                for article in articles_to_send
+            )
             
-            # 배치 단위 삽입 (최대 10개 그룹씩)
-            for i in range(0, len(entries_to_send), 10):
-                batch = entries_to_send[i:i+10]
-                sqs_client.send_message_batch(QueueUrl=ARTICLE_SQS_QUEUE_URL, Entries=batch)
+            # 배치 단위 삽입 (최대 10개 그룹씩, 배치 간 병렬 전송)
+            send_entries_to_sqs(ARTICLE_SQS_QUEUE_URL, entries_to_send)
             
             logger.info("✅ Successfully sent all articles to SQS.")
             
@@ -356,18 +459,16 @@ def lambda_handler(event, context):
                         'negativeArticleCount': counts['negative'],
                         'neutralArticleCount': counts['neutral'],
                         'predictionDate': prediction_date.isoformat(),
-                        'createdAt': datetime.now(pytz.timezone("Asia/Seoul")).isoformat()
+                        'createdAt': created_at
                     }
                 }
                 stats_entries_to_send.append({
                     'Id': ticker_code.replace('.', '-'),
-                    'MessageBody': json.dumps(message_body)
+                    'MessageBody': to_json(message_body)
                 })
 
             # 통계 메시지 일괄 전송
-            for i in range(0, len(stats_entries_to_send), 10):
-                batch = stats_entries_to_send[i:i+10]
-                sqs_client.send_message_batch(QueueUrl=PREDICTION_SQS_QUEUE_URL, Entries=batch)
+            send_entries_to_sqs(PREDICTION_SQS_QUEUE_URL, stats_entries_to_send)
             logger.info("✅ Successfully sent all sentiment stats to SQS.")
 
     except Exception as e:
@@ -1,11 +1,17 @@
 import os
 import json
 import logging
-import uuid
 import boto3
+from botocore.config import Config
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 
+try:
+    import orjson
+except ImportError: # orjson이 Lambda Layer에 없는 환경에서는 표준 json 사용
+    orjson = None
+
 # --- 설정 및 초기화 ---
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -13,10 +19,22 @@ logger.setLevel(logging.INFO)
 EODHD_API_KEY = os.environ.get('EODHD_API_KEY')
 PREDICTION_LLM_QUEUE_URL = os.environ.get('PREDICTION_LLM_QUEUE_URL')
 
-sqs_client = boto3.client('sqs')
+sqs_client = boto3.client('sqs', config=Config(
+    tcp_keepalive=True,
+    max_pool_connections=50, # 배치 동시 전송을 위한 커넥션 풀
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+))
 
 API_FETCH_LIMIT = 300
 SQS_BATCH_SIZE = 10
+# 동시에 전송 중(in-flight)일 수 있는 SQS 배치 수
+SQS_SEND_MAX_WORKERS = 10
+
+def to_json(obj):
+    """SQS MessageBody용 JSON 문자열을 생성합니다. (orjson 우선 사용)"""
+    if orjson:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
 
 def fetch_eodhd_market_news():
     """
@@ -56,10 +74,13 @@ def send_sqs_batch(entries):
     if not entries:
         return
     try:
-        sqs_client.send_message_batch(
+        response = sqs_client.send_message_batch(
             QueueUrl=PREDICTION_LLM_QUEUE_URL,
             Entries=entries
         )
+        failed = len(response.get('Failed', []))
+        if failed > 0:
+            logger.error(f"SQS Batch Partial Failure: {failed} messages failed.")
     except Exception as e:
         logger.exception("Critical error sending SQS batch.")
 
@@ -75,36 +96,24 @@ def lambda_handler(event, context):
     if not news_list:
         return {"statusCode": 200, "body": "No news found."}
 
-    total_queued = 0
-    sqs_buffer = []
-
-    for article in news_list:
-        headline = article.get('title')
-        if not headline:
-            continue
-        
-        date_str = article.get('date')
-
-        # 일반 시장 뉴스이므로 Symbol은 'Market'으로 표기
-        payload = {
-            'headline': headline,
-            'symbol': 'Market',
-            'datetime': date_str
-        }
-
-        entry = {
-            'Id': str(uuid.uuid4()),
-            'MessageBody': json.dumps(payload)
+    # 2. 전체 SQS 엔트리를 한 번에 구성 (일반 시장 뉴스이므로 Symbol은 'Market'으로 표기)
+    entries = [
+        {
+            'Id': f"m{idx}", # SQS 배치 전송용 ID (배치 내에서만 고유하면 됨)
+            'MessageBody': to_json({
+                'headline': article['title'],
+                'symbol': 'Market',
+                'datetime': article.get('date')
+            })
         }
-        sqs_buffer.append(entry)
-        total_queued += 1
-
-        if len(sqs_buffer) >= SQS_BATCH_SIZE:
-            send_sqs_batch(sqs_buffer)
-            sqs_buffer = []
+        for idx, article in enumerate(news_list) if article.get('title')
+    ]
+    total_queued = len(entries)
 
-    if sqs_buffer:
-        send_sqs_batch(sqs_buffer)
+    # 3. 10개 단위 배치를 스레드 풀에서 동시에 전송하고 모두 끝날 때까지 대기
+    batches = [entries[i:i + SQS_BATCH_SIZE] for i in range(0, len(entries), SQS_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=SQS_SEND_MAX_WORKERS) as executor:
+        list(executor.map(send_sqs_batch, batches))
 
     logger.info(f"Done. Queued {total_queued} headlines from EODHD (Single Call).")
     return {"statusCode": 200, "body": "Success"}
\ No newline at end of file
@@ -1,22 +1,73 @@
 import os
 import json
 import logging
-import uuid
+import time
 import boto3
+from botocore.config import Config
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+from urllib.parse import quote, urlencode
+
+try:
+    import orjson
+except ImportError: # orjson이 Lambda Layer에 없는 환경에서는 표준 json 사용
+    orjson = None
 
 # --- 설정 및 초기화 ---
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 FINNHUB_API_KEY = os.environ.get('FINNHUB_API_KEY')
+FINNHUB_COMPANY_NEWS_URL = "https://finnhub.io/api/v1/company-news"
 PREDICTION_LLM_QUEUE_URL = os.environ.get('PREDICTION_LLM_QUEUE_URL')
 
-sqs_client = boto3.client('sqs')
+sqs_client = boto3.client('sqs', config=Config(
+    tcp_keepalive=True,
+    max_pool_connections=50, # 배치 동시 전송을 위한 커넥션 풀
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+))
 ssm_client = boto3.client('ssm')
 
+# 웜 컨테이너에서 TCP/TLS 커넥션을 재사용하도록 HTTP 세션을 모듈 레벨에 유지 (스레드 간 공유)
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+))
+
 SQS_BATCH_SIZE = 10
+# 동시에 전송 중(in-flight)일 수 있는 SQS 배치 수
+SQS_SEND_MAX_WORKERS = 10
+# 티커별 뉴스 조회 동시 실행 수 (API Rate Limit 고려)
+FETCH_MAX_WORKERS = 10
+# 티커 목록은 자주 바뀌지 않으므로 웜 컨테이너에서는 TTL 동안 재조회하지 않음
+TICKER_CACHE_TTL_SECONDS = 900
+
+# 호출 간 재사용되는 티커 코드 목록 캐시
+_ticker_cache = {'data': None, 'fetched_at': 0.0}
+
+def to_json(obj):
+    """SQS MessageBody용 JSON 문자열을 생성합니다. (orjson 우선 사용)"""
+    if orjson:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+def from_json(data):
+    """JSON 문자열을 파싱합니다. (orjson 우선 사용)"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def build_headline_body(headline, symbol_json, published):
+    """
+    {'headline', 'symbol', 'datetime'} 메시지 본문을 직접 조립합니다.
+    symbol은 티커당 한 번만 인코딩된 JSON 문자열(symbol_json)을 재사용합니다.
+    """
+    return '{"headline":' + to_json(headline) + ',"symbol":' + symbol_json + ',"datetime":' + to_json(published) + '}'
 
 def get_tickers_from_parameter_store():
     """Parameter Store에서 티커 목록 조회"""
@@ -30,7 +81,7 @@ def get_tickers_from_parameter_store():
         # 성공적으로 조회된 파라미터들을 순회하며 하나의 리스트로 병합합니다.
         for param in response.get('Parameters', []):
             try:
-                cached_data = json.loads(param['Value'])
+                cached_data = from_json(param['Value'])
                 all_tickers.extend(cached_data.get('tickers', []))
             except json.JSONDecodeError:
                 logger.error(f"Failed to parse JSON for parameter: {param.get('Name')}")
@@ -39,27 +90,35 @@ def get_tickers_from_parameter_store():
         invalid_params = response.get('InvalidParameters', [])
         if invalid_params:
             logger.warning(f"Invalid or missing parameters: {invalid_params}")
-        all_tickers = cached_data.get('tickers', [])
         ticker_codes = [item[1] for item in all_tickers if item]
         return ticker_codes
     except Exception as e:
         logger.exception("Failed to get tickers.")
         return []
 
-def fetch_company_news(symbol, limit=100):
-    """Finnhub에서 뉴스 조회 후 최대 limit 개수만큼 잘라서 반환"""
-    url = "https://finnhub.io/api/v1/company-news"
+def get_tickers():
+    """티커 코드 목록을 반환합니다. 캐시가 유효하면 Parameter Store 조회를 생략합니다."""
+    if _ticker_cache['data'] and time.monotonic() - _ticker_cache['fetched_at'] < TICKER_CACHE_TTL_SECONDS:
+        return _ticker_cache['data']
+
+    tickers = get_tickers_from_parameter_store()
+    if tickers:
+        _ticker_cache['data'] = tickers
+        _ticker_cache['fetched_at'] = time.monotonic()
+    return tickers
+
+def build_fixed_query():
+    """티커와 무관한 조회 파라미터(오늘 날짜 범위, 토큰)를 실행당 한 번만 URL 인코딩합니다."""
     today_str = datetime.now(timezone.utc).strftime('%Y-%m-%d')
-    
-    params = {
-        'symbol': symbol,
-        'from': today_str,
-        'to': today_str,
-        'token': FINNHUB_API_KEY
-    }
+    return urlencode({'from': today_str, 'to': today_str, 'token': FINNHUB_API_KEY})
+
+def fetch_company_news(symbol, fixed_query, limit=100):
+    """Finnhub에서 뉴스 조회 후 최대 limit 개수만큼 잘라서 반환"""
+    # 고정 파라미터는 미리 인코딩된 쿼리 문자열을 재사용하고, symbol만 티커별로 붙임
+    url = f"{FINNHUB_COMPANY_NEWS_URL}?symbol={quote(symbol, safe='')}&{fixed_query}"
     
     try:
-        response = requests.get(url, params=params, timeout=5)
+        response = http_session.get(url, timeout=5)
         response.raise_for_status()
         news_data = response.json()
         
@@ -91,54 +150,50 @@ def lambda_handler(event, context):
         logger.error("Environment variables missing.")
         return {"statusCode": 500, "body": "Config Error"}
 
-    tickers = get_tickers_from_parameter_store()
+    tickers = get_tickers()
     if not tickers:
         return {"statusCode": 200, "body": "No tickers found."}
 
     total_queued = 0
     sqs_buffer = []
-
-    for symbol in tickers:
-        # fetch_company_news 함수 내부에서 이미 최대 100개로 잘려서 반환됩니다.
-        news_list = fetch_company_news(symbol)
+    # 버퍼가 찰 때마다 배치를 백그라운드로 전송하여 여러 배치가 동시에 전송되도록 함
+    # with 블록을 벗어날 때(예외 포함) 진행 중인 전송이 모두 끝날 때까지 대기
+    with ThreadPoolExecutor(max_workers=SQS_SEND_MAX_WORKERS) as send_executor:
+        # 티커별 HTTP 조회는 네트워크 대기가 대부분이므로 스레드 풀로 동시에 요청하고, 완료된 순서대로 처리
+        with ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS) as executor:
+            fixed_query = build_fixed_query()
+            futures = {executor.submit(fetch_company_news, symbol, fixed_query): symbol for symbol in tickers}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                news_list = future.result() # 함수 내부에서 이미 최대 100개로 잘려서 반환됩니다.
         
-        if not news_list:
-            continue
+                if not news_list:
+                    continue
+                symbol_json = to_json(symbol) # 티커당 한 번만 인코딩
 
-        for news_item in news_list:
-            # 헤드라인만 추출
-            headline = news_item.get('headline')
+                for news_item in news_list:
+                    # 헤드라인만 추출
+                    headline = news_item.get('headline')
             
-            # 헤드라인이 비어있으면 스킵
-            if not headline:
-                continue
-
-            # 전송할 데이터 페이로드 최소화
-            payload = {
-                'headline': headline,
-                'symbol': symbol,                 # 예측 대상 기업
-                'datetime': news_item.get('datetime') # 뉴스 발생 시간 (Time Series 분석용)
-            }
-
-            entry = {
-                'Id': str(uuid.uuid4()),
-                # 전체 news_item 대신 경량화된 payload 전송
-                'MessageBody': json.dumps(payload),
-                'MessageAttributes': {
-                    'Source': {'StringValue': 'Finnhub', 'DataType': 'String'},
-                    'Ticker': {'StringValue': symbol, 'DataType': 'String'}
-                }
-            }
-            sqs_buffer.append(entry)
-            total_queued += 1
-
-            if len(sqs_buffer) >= SQS_BATCH_SIZE:
-                send_sqs_batch(sqs_buffer)
-                sqs_buffer = []
-
-    # 남은 잔여 버퍼 전송
-    if sqs_buffer:
-        send_sqs_batch(sqs_buffer)
+                    # 헤드라인이 비어있으면 스킵
+                    if not headline:
+                        continue
+
+                    entry = {
+                        'Id': str(len(sqs_buffer)), # 배치 내에서만 고유하면 되므로 버퍼 내 위치(0~9) 사용
+                        # 전체 news_item 대신 경량화된 payload(헤드라인, 예측 대상 기업, 뉴스 발생 시간) 전송
+                        'MessageBody': build_headline_body(headline, symbol_json, news_item.get('datetime'))
+                    }
+                    sqs_buffer.append(entry)
+                    total_queued += 1
+
+                    if len(sqs_buffer) >= SQS_BATCH_SIZE:
+                        send_executor.submit(send_sqs_batch, sqs_buffer)
+                        sqs_buffer = []
+
+        # 남은 잔여 버퍼 전송
+        if sqs_buffer:
+            send_executor.submit(send_sqs_batch, sqs_buffer)
 
     logger.info(f"Done. Queued {total_queued} headlines.")
     return {"statusCode": 200, "body": "Success"}
\ No newline at end of file
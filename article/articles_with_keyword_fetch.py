@@ -3,6 +3,7 @@ import json
 import logging
 import boto3
 import psycopg2
+from datetime import datetime, timedelta, timezone
 from difflib import SequenceMatcher
 
 # --- 설정 및 초기화 ---
@@ -21,12 +22,28 @@ FETCH_QUEUE_URL = os.environ.get('FETCH_QUEUE_URL')
 sqs_client = boto3.client('sqs')
 
 
+# Lambda 실행 컨텍스트 간에 DB 연결을 재사용하기 위한 전역 변수
+db_conn = None
+
 def get_db_connection():
-    """RDS 데이터베이스 연결을 생성합니다."""
+    """RDS 데이터베이스 연결을 생성하거나, 웜 컨테이너에서는 기존 연결을 재사용합니다."""
+    global db_conn
+    # 기존 연결이 살아있으면 재사용 (유휴 중 서버/프록시에서 끊긴 연결은 SELECT 1로 걸러냄)
+    if db_conn is not None and db_conn.closed == 0:
+        try:
+            with db_conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return db_conn
+        except psycopg2.Error:
+            logger.warning("Cached DB connection is not usable. Reconnecting.")
+            db_conn.close()
     try:
-        return psycopg2.connect(
+        db_conn = psycopg2.connect(
             host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASSWORD, port=DB_PORT
         )
+        # 조회 전용 Lambda이므로 autocommit으로 BEGIN/ROLLBACK 왕복을 생략
+        db_conn.autocommit = True
+        return db_conn
     except Exception as e:
         logger.error(f"DB Connection Error: {e}")
         raise e
@@ -59,20 +76,21 @@ def deduplicate_articles(articles, similarity_threshold=0.8):
 
 def lambda_handler(event, context):
     logger.info("Lambda 1: Fetching recent articles from RDS DB...")
-    conn = None
     try:
         conn = get_db_connection()
         cur = conn.cursor()
         
         # 1. DB에서 최근 24시간 이내의 기사 조회 (최대 50개)
+        # 조회 기준 시각은 Python에서 계산해 파라미터로 전달 (쿼리 문자열은 호출마다 동일)
+        since = datetime.now(timezone.utc) - timedelta(days=1)
         query = """
             SELECT id, COALESCE(title_kr, title), description
             FROM article
-            WHERE published_date >= NOW() - INTERVAL '1 day'
+            WHERE published_date >= %s
             ORDER BY published_date DESC
             LIMIT 50;
         """
-        cur.execute(query)
+        cur.execute(query, (since,))
         rows = cur.fetchall()
         cur.close()
         
@@ -109,6 +127,3 @@ def lambda_handler(event, context):
     except Exception as e:
         logger.error(f"Lambda 1 Critical Error: {e}")
         raise e
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
@@ -3,6 +3,7 @@ import json
 import logging
 import uuid
 import boto3
+from itertools import islice
 from google import genai
 from google.genai import types
 
@@ -39,8 +40,6 @@ def get_tickers_from_parameter_store():
         invalid_params = response.get('InvalidParameters', [])
         if invalid_params:
             logger.warning(f"Invalid or missing parameters: {invalid_params}")
-            
-        all_tickers = cached_data.get('tickers', [])
 
         ticker_map = {}
         ticker_desc_list = []
@@ -175,8 +174,9 @@ def lambda_handler(event, context):
                     'MessageBody': json.dumps(save_payload)
                 })
                 
-            for i in range(0, len(entries_to_send), 10):
-                batch = entries_to_send[i:i+10]
+            # 10개 단위 배치 전송 (슬라이스 복사 없이 이터레이터에서 순차 소비)
+            entries_iter = iter(entries_to_send)
+            while batch := list(islice(entries_iter, 10)):
                 sqs_client.send_message_batch(QueueUrl=SAVE_QUEUE_URL, Entries=batch)
                 
             logger.info(f"Successfully mapped tickers and queued {len(entries_to_send)} keyword messages.")
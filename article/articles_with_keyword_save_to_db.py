@@ -15,11 +15,27 @@ DB_USER = os.environ.get('DB_USER')
 DB_PASSWORD = os.environ.get('DB_PASSWORD')
 DB_PORT = os.environ.get('DB_PORT', '5432')
 
+# Lambda 실행 컨텍스트 간에 DB 연결을 재사용하기 위한 전역 변수
+db_conn = None
+
 def get_db_connection():
+    """RDS 데이터베이스 연결을 생성하거나, 웜 컨테이너에서는 기존 연결을 재사용합니다."""
+    global db_conn
+    # 기존 연결이 살아있으면 재사용 (유휴 중 서버/프록시에서 끊긴 연결은 SELECT 1로 걸러냄)
+    if db_conn is not None and db_conn.closed == 0:
+        try:
+            with db_conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            db_conn.rollback() # 확인용 트랜잭션 종료
+            return db_conn
+        except psycopg2.Error:
+            logger.warning("Cached DB connection is not usable. Reconnecting.")
+            db_conn.close()
     try:
-        return psycopg2.connect(
+        db_conn = psycopg2.connect(
             host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASSWORD, port=DB_PORT
         )
+        return db_conn
     except Exception as e:
         logger.error(f"DB Connection Error: {e}")
         raise e
@@ -79,8 +95,5 @@ def lambda_handler(event, context):
             if conn:
                 conn.rollback()
             raise e
-        finally:
-            if conn:
-                conn.close()
                 
     return {'statusCode': 200, 'body': f'Processed {len(records_to_insert)} items.'}
\ No newline at end of file
@@ -3,6 +3,7 @@ import json
 import logging
 import boto3
 import uuid
+from itertools import islice
 from polygon import RESTClient
 from datetime import datetime, timedelta, timezone
 
@@ -22,11 +23,14 @@ def fetch_articles(published_utc_gte, limit):
         
         response = polygon_client.list_ticker_news(
             limit=limit,
-            order='asc',
+            order='desc',
             published_utc_gte=published_utc_gte
         )
         if response:
-            return list(response)
+            # SDK 이터레이터는 소비하는 만큼 다음 페이지를 자동 요청하므로,
+            # limit개까지만 소비하여 첫 페이지 1회 호출로 제한
+            # (최신순으로 조회해야 잘라낼 때 가장 최근 기사가 남음)
+            return list(islice(response, limit))
     except Exception as e:
         logger.error("Polygon news API failed", e)
     return []
@@ -53,17 +57,12 @@ def lambda_handler(event, context):
             return {'statusCode': 200, 'body': 'No articles found.'}
 
         # 2. 전체 기사 리스트 구성 (필요한 필드만 추출)
-        all_articles = []
-        for article in articles_raw:
-            title = article.title
-            description = article.description
-            
-            # 제목이나 설명이 없는 기사는 제외
-            if title and description:
-                all_articles.append({
-                    'title': title,
-                    'description': description
-                })
+        # 제목이나 설명이 없는 기사는 제외하고, 필요한 두 필드만 담은 dict를 한 번에 생성
+        all_articles = [
+            {'title': article.title, 'description': article.description}
+            for article in articles_raw
+            if article.title and article.description
+        ]
 
         logger.info(f"Processed {len(all_articles)} valid articles for summary.")
 
@@ -1,14 +1,22 @@
 import os
 import json
+import gzip
+import base64
 import logging
+import time
 import boto3
-from itertools import groupby
-from operator import itemgetter
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from supabase import create_client, Client
 import uuid
 from polygon import RESTClient
 from datetime import datetime, timedelta, timezone
 
+try:
+    import orjson
+except ImportError: # orjson이 Lambda Layer에 없는 환경에서는 표준 json 사용
+    orjson = None
+
 # 로거 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -18,10 +26,50 @@ SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 LLM_REQUEST_SQS_QUEUE_URL = os.environ.get('LLM_REQUEST_SQS_QUEUE_URL')
-sqs_client = boto3.client('sqs')
+# 배치 병렬 전송 시 커넥션을 재사용하고, 스로틀링은 adaptive 재시도로 흡수
+SQS_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+sqs_client = boto3.client('sqs', config=SQS_CLIENT_CONFIG)
 ssm_client = boto3.client('ssm')
 polygon_client = RESTClient(POLYGON_API_KEY)
 
+# 티커 목록은 자주 바뀌지 않으므로 웜 컨테이너에서는 TTL 동안 재조회하지 않음
+TICKER_CACHE_TTL_SECONDS = 900
+# SQS 배치 전송 동시 실행 수 및 부분 실패 재전송 최대 시도 횟수
+SQS_SEND_MAX_WORKERS = 16
+SQS_SEND_MAX_ATTEMPTS = 3
+# 이 크기(bytes) 이상의 메시지만 gzip 압축 (작은 메시지는 압축 이득보다 오버헤드가 큼)
+COMPRESSION_THRESHOLD_BYTES = 1024
+
+# 호출 간 재사용되는 티커 목록 캐시
+_ticker_cache = {'data': None, 'fetched_at': 0.0}
+
+
+def to_json(obj):
+    """SQS MessageBody용 JSON 문자열을 생성합니다. (orjson 우선 사용, 한글은 이스케이프하지 않음)"""
+    if orjson:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def build_message_entry(entry_id, message_body):
+    """
+    SQS 배치 엔트리를 생성합니다.
+    임계값 이상의 페이로드는 gzip 압축 후 base64로 인코딩하고, 'encoding' 속성으로 표시합니다.
+    """
+    body = to_json(message_body)
+    raw = body.encode('utf-8')
+    if len(raw) < COMPRESSION_THRESHOLD_BYTES:
+        return {'Id': entry_id, 'MessageBody': body}
+    return {
+        'Id': entry_id,
+        'MessageBody': base64.b64encode(gzip.compress(raw, compresslevel=1)).decode('ascii'),
+        'MessageAttributes': {'encoding': {'DataType': 'String', 'StringValue': 'gzip+base64'}}
+    }
+
 
 def get_tickers_from_parameter_store():
     """Parameter Store에서 저장된 티커 목록을 가져옵니다."""
@@ -74,6 +122,19 @@ def get_tickers_from_supabase():
         logger.exception("Failed to fetch tickers from Supabase.")
     return []
 
+def get_tickers():
+    """티커 목록을 반환합니다. 캐시가 유효하면 Parameter Store/DB 조회를 생략합니다."""
+    if _ticker_cache['data'] and time.monotonic() - _ticker_cache['fetched_at'] < TICKER_CACHE_TTL_SECONDS:
+        return _ticker_cache['data']
+
+    tickers = get_tickers_from_parameter_store() # 선 파라미터 조회
+    if tickers is None:
+        tickers = get_tickers_from_supabase() # 안전장치로 db에서 조회
+    if tickers:
+        _ticker_cache['data'] = tickers
+        _ticker_cache['fetched_at'] = time.monotonic()
+    return tickers
+
 def fetch_articles(published_utc_gte, limit):
     """Polygon API를 호출하여 뉴스를 가져옵니다."""
     try:
@@ -90,6 +151,34 @@ def fetch_articles(published_utc_gte, limit):
     return []
 
 
+def send_batch_with_retry(batch):
+    """
+    SQS로 배치를 전송하고, 부분 실패한 엔트리만 지수 백오프로 재전송합니다.
+    최종적으로 전송에 실패한 메시지 수를 반환합니다.
+    """
+    for attempt in range(SQS_SEND_MAX_ATTEMPTS):
+        response = sqs_client.send_message_batch(
+            QueueUrl=LLM_REQUEST_SQS_QUEUE_URL,
+            Entries=batch
+        )
+        failed = response.get('Failed', [])
+        if not failed:
+            return 0
+
+        # 요청 자체가 잘못된(SenderFault) 엔트리는 재시도해도 실패하므로 제외
+        retryable_ids = {f['Id'] for f in failed if not f.get('SenderFault')}
+        if len(retryable_ids) < len(failed):
+            logger.error(f"SQS rejected messages (sender fault): {[f for f in failed if f.get('SenderFault')]}")
+        batch = [entry for entry in batch if entry['Id'] in retryable_ids]
+        if not batch:
+            return len(failed)
+        if attempt < SQS_SEND_MAX_ATTEMPTS - 1:
+            time.sleep(0.1 * (2 ** attempt))
+
+    logger.error(f"Failed to send {len(batch)} messages after {SQS_SEND_MAX_ATTEMPTS} attempts.")
+    return len(batch)
+
+
 def lambda_handler(event, context):
     """여러 종목 정보가 포함된 뉴스를 각 티커별로 그룹화하여 SQS로 전송합니다."""
     logger.info("Article collection Lambda handler started.")
@@ -103,9 +192,7 @@ def lambda_handler(event, context):
         logger.info(f"Will fetch article >= {published_utc_gte} (UTC)")
         
         # 2. 티커 정보 가져오기 (매핑용)
-        tickers = get_tickers_from_parameter_store() # 선 파라미터 조회
-        if tickers is None:
-            tickers = get_tickers_from_supabase() # 안전장치로 db에서 조회
+        tickers = get_tickers() # 캐시 -> 파라미터 -> db 순으로 조회
         
         # ticker_code -> {id, name} 매핑 맵 생성
         # API 응답의 'tickers' 필드는 ticker code 리스트입니다.
@@ -117,9 +204,8 @@ def lambda_handler(event, context):
 
         # 4. 데이터 가공 및 그룹화
         # API 결과의 각 기사는 여러 티커를 포함할 수 있습니다 ("tickers": ["AAPL", "MSFT"])
-        # 따라서 이를 "티커별 기사" 형태로 플랫하게 펼쳐야 합니다.
-        
-        flattened_data = []
+        # 따라서 각 기사를 포함된 티커별 그룹에 바로 담습니다. (정렬 없이 dict로 그룹화)
+        articles_by_ticker = {}
         
         for article in articles_raw:
             article_tickers = article.tickers
@@ -137,72 +223,56 @@ def lambda_handler(event, context):
                 # 우리가 관리하는 티커인지 확인
                 ticker_info = ticker_info_map.get(ticker_code)
                 if ticker_info:
-                    flattened_data.append({
-                        'ticker_id': ticker_info['id'],
-                        'short_company_name': ticker_info['name'],
+                    articles_by_ticker.setdefault(ticker_info['id'], (ticker_info['name'], []))[1].append({
                         'title': title,
                         'description': description
                     })
 
-        # ticker_id 기준으로 정렬 (groupby를 위해 필수)
-        flattened_data.sort(key=itemgetter('ticker_id'))
-        
-        grouped_data = []
-        # ticker_id로 그룹화
-        for ticker_id, items in groupby(flattened_data, key=itemgetter('ticker_id')):
-            items_list = list(items)
-            first_item = items_list[0]
-            
-            # 해당 티커의 기사 리스트 생성
-            articles = [
-                {'title': item['title'], 
-                 'description': item['description']}
-                for item in items_list
-            ]
-            
-            # 너무 많으면 자르기 (SQS 용량 고려)
-            if len(articles) > 20:
-                articles = articles[:20]
-
-            grouped_data.append({
-                'tickerId': ticker_id,
-                'shortCompanyName': first_item['short_company_name'],
-                'articles': articles
-            })
-
-        logger.info(f"Generated {len(grouped_data)} unique ticker messages.")
-
-        # 5. SQS로 메시지 전송 (배치 처리)
-        entries = []
-        for item in grouped_data:
-            # 메시지 본문 생성 (LLM이 처리하기 좋은 포맷)
-            message_body = {
-                'tickerId': item['tickerId'],
-                'shortCompanyName': item['shortCompanyName'],
-                'articles': item['articles'],
-                'requestId': str(uuid.uuid4())
-            }
-
-            entries.append({
-                'Id': str(uuid.uuid4()), # SQS 배치 전송용 고유 ID
-                'MessageBody': json.dumps(message_body, ensure_ascii=False)
-            })
-
-        # 10개 단위로 나누어 전송 (SQS 배치 제한)
-        for i in range(0, len(entries), 10):
-            batch = entries[i:i+10]
-            try:
-                sqs_client.send_message_batch(
-                    QueueUrl=LLM_REQUEST_SQS_QUEUE_URL,
-                    Entries=batch
-                )
-                logger.info(f"Sent batch of {len(batch)} messages to SQS.")
-            except Exception as e:
-                logger.error(f"Failed to send batch to SQS: {e}")
+        # 5. 티커 그룹마다 메시지를 만들고, 10개(SQS 배치 제한)가 차면 즉시 백그라운드 전송
+        # (메시지 직렬화와 SQS 전송이 겹쳐서 진행됨)
+        ticker_count = 0
+        request_id_base = uuid.uuid4().hex # 실행당 1회만 생성하고 티커 순번을 붙여 requestId로 사용
+        pending = []
+        futures = {}
+        with ThreadPoolExecutor(max_workers=SQS_SEND_MAX_WORKERS) as executor:
+            for ticker_id, (short_company_name, articles) in articles_by_ticker.items():
+                # 너무 많으면 자르기 (SQS 용량 고려)
+                if len(articles) > 20:
+                    articles = articles[:20]
+
+                # 메시지 본문 생성 (LLM이 처리하기 좋은 포맷)
+                message_body = {
+                    'tickerId': ticker_id,
+                    'shortCompanyName': short_company_name,
+                    'articles': articles,
+                    'requestId': f"{request_id_base}-{ticker_count}"
+                }
+
+                # SQS 배치 전송용 ID는 배치 내에서만 고유하면 됨
+                pending.append(build_message_entry(f"m{len(pending)}", message_body))
+                ticker_count += 1
+
+                if len(pending) == 10:
+                    futures[executor.submit(send_batch_with_retry, pending)] = pending
+                    pending = []
+
+            # 남은 잔여 배치 전송
+            if pending:
+                futures[executor.submit(send_batch_with_retry, pending)] = pending
+
+            logger.info(f"Generated {ticker_count} unique ticker messages.")
+
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    failed_count = future.result()
+                    logger.info(f"Sent batch of {len(batch) - failed_count} messages to SQS.")
+                except Exception as e:
+                    logger.error(f"Failed to send batch to SQS: {e}")
 
         return {
             'statusCode': 200,
-            'body': json.dumps(f"Successfully processed {len(grouped_data)} tickers and sent messages.")
+            'body': json.dumps(f"Successfully processed {ticker_count} tickers and sent messages.")
         }
 
     except Exception as e:
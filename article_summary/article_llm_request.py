@@ -1,6 +1,8 @@
 # article_llm_request.py
 import os
 import json
+import gzip
+import base64
 import time
 import logging
 import boto3
@@ -8,6 +10,7 @@ from google import genai
 from google.genai import types
 from botocore.exceptions import ClientError
 from datetime import datetime, timedelta, timezone
+from itertools import islice
 
 # --- 설정 및 초기화 ---
 logger = logging.getLogger()
@@ -21,6 +24,14 @@ ARTICLE_LLM_RESULT_SQS_QUEUE_URL = os.environ.get('ARTICLE_LLM_RESULT_SQS_QUEUE_
 sqs_client = boto3.client('sqs')
 client = genai.Client(api_key=GEMINI_API_KEY)
 
+def parse_message_body(record):
+    """SQS 레코드 본문을 파싱합니다. 'encoding' 속성이 gzip+base64이면 압축을 해제한 뒤 파싱합니다."""
+    body = record['body']
+    encoding = record.get('messageAttributes', {}).get('encoding', {}).get('stringValue')
+    if encoding == 'gzip+base64':
+        body = gzip.decompress(base64.b64decode(body)).decode('utf-8')
+    return json.loads(body)
+
 def call_gemini_model(company_name, articles):
     """
     Gemini API를 호출하여 뉴스를 분석하고 구조화된 JSON 데이터를 반환합니다.
@@ -95,7 +106,7 @@ def lambda_handler(event, context):
     for record in event.get('Records', []):
         try:
             # SQS 메시지 파싱
-            body = json.loads(record['body'])
+            body = parse_message_body(record)
             
             ticker_id = body.get('tickerId')
             short_company_name = body.get('shortCompanyName')
@@ -170,9 +181,9 @@ def lambda_handler(event, context):
     # --- 결과 SQS 전송 ---
     if entries_to_send:
         try:
-            # 10개 단위 배치 전송
-            for i in range(0, len(entries_to_send), 10):
-                batch = entries_to_send[i:i+10]
+            # 10개 단위 배치 전송 (슬라이스 복사 없이 이터레이터에서 순차 소비)
+            entries_iter = iter(entries_to_send)
+            while batch := list(islice(entries_iter, 10)):
                 sqs_client.send_message_batch(
                     QueueUrl=ARTICLE_LLM_RESULT_SQS_QUEUE_URL,
                     Entries=batch
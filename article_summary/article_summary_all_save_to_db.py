@@ -3,9 +3,12 @@ import json
 import logging
 import boto3
 import psycopg2
-from psycopg2.extras import execute_values
 from datetime import datetime, timezone
-import uuid
+
+try:
+    import orjson
+except ImportError: # orjson이 Lambda Layer에 없는 환경에서는 표준 json 사용
+    orjson = None
 
 # --- 설정 ---
 logger = logging.getLogger()
@@ -18,101 +21,150 @@ DB_USER = os.environ.get('DB_USER')
 DB_PASSWORD = os.environ.get('DB_PASSWORD')
 DB_PORT = os.environ.get('DB_PORT')
 
+# 키워드 컬럼 최대 길이 (문자 수)
+KEYWORDS_MAX_LENGTH = 100
+
 # SQS 클라이언트
 sqs_client = boto3.client('sqs')
 
+def from_json(data):
+    """SQS 메시지 본문(JSON 문자열)을 파싱합니다. (orjson 우선 사용)"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Lambda 실행 컨텍스트 간에 DB 연결을 재사용하기 위한 전역 변수
+db_conn = None
+
 def get_db_connection():
-    """RDS 데이터베이스 연결을 생성합니다."""
+    """RDS 데이터베이스 연결을 생성하거나, 웜 컨테이너에서는 기존 연결을 재사용합니다."""
+    global db_conn
+    # 기존 연결이 살아있으면 재사용 (유휴 중 서버/프록시에서 끊긴 연결은 SELECT 1로 걸러냄)
+    if db_conn is not None and db_conn.closed == 0:
+        try:
+            with db_conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            db_conn.rollback() # 확인용 트랜잭션 종료
+            return db_conn
+        except psycopg2.Error:
+            logger.warning("Cached DB connection is not usable. Reconnecting.")
+            db_conn.close()
     try:
-        conn = psycopg2.connect(
+        db_conn = psycopg2.connect(
             host=DB_HOST,
             database=DB_NAME,
             user=DB_USER,
             password=DB_PASSWORD,
             port=DB_PORT
         )
-        return conn
+        return db_conn
     except Exception as e:
         logger.error(f"ERROR: Could not connect to Postgres instance: {e}")
         raise e
 
+def truncate_keywords(body, key):
+    """키워드 문자열을 최대 길이로 자름 (값이 없으면 None)
+    PostgreSQL의 varchar(n)은 바이트가 아닌 문자 수 기준이므로 문자열 슬라이싱으로 충분"""
+    value = body.get(key)
+    return value[:KEYWORDS_MAX_LENGTH] if value else None
+
+def parse_record(record, default_summary_date, now_iso):
+    """SQS 레코드 하나를 INSERT용 튜플로 변환 (파싱 실패 시 None)"""
+    try:
+        body = from_json(record['body'])
+        
+        # SQS 메시지 필드 추출
+        summary_date = body.get('summaryDate')
+        
+        # 날짜 처리 (요청하신 대로 분/초 단위 절삭 -> 시간 단위 저장)
+        if not summary_date:
+            summary_date = default_summary_date
+
+        # 튜플 형태로 데이터 구성 (삽입 시 컬럼별 배열로 전치)
+        # 순서: summary_date, pos_reason, neg_reason, pos_kw, neg_kw, created_at (id는 DB에서 생성)
+        row = (
+            summary_date,
+            body.get('positiveReasoning'),
+            body.get('negativeReasoning'),
+            truncate_keywords(body, 'positiveKeywords'),
+            truncate_keywords(body, 'negativeKeywords'),
+            now_iso
+        )
+        return row
+    except Exception as e:
+        logger.error(f"Error parsing record {record.get('messageId')}: {e}")
+        return None
+
+def insert_rows(cur, rows):
+    """행 튜플 목록을 article_summary_all에 일괄 삽입"""
+    # [수정] 대상 테이블 article_summary_all
+    # ON CONFLICT DO NOTHING (제약조건 위반 시 Skip)
+    # summary_date 등에 unique constraint가 걸려있어야 합니다.
+    insert_query = """
+        INSERT INTO article_summary_all (
+            id, 
+            summary_date, 
+            positive_reasoning, 
+            negative_reasoning, 
+            positive_keywords, 
+            negative_keywords, 
+            created_at
+        )
+        SELECT gen_random_uuid(), *
+        FROM UNNEST(%s::timestamptz[], %s::text[], %s::text[], %s::text[], %s::text[], %s::timestamptz[])
+        ON CONFLICT DO NOTHING
+    """
+    
+    # id는 gen_random_uuid()로 DB에서 생성하고, 행 튜플은 컬럼별 리스트로 전치하여 배열 파라미터로 전달
+    columns = [list(column) for column in zip(*rows)]
+    cur.execute(insert_query, columns)
+
 def lambda_handler(event, context):
     logger.info("Starting Save LLM Result handler (Global Summary / Prod)...")
     
-    records_to_insert = []
+    # 현재 시각은 배치당 한 번만 조회하여 모든 레코드에 재사용
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat()
+    default_summary_date = now.replace(minute=0, second=0, microsecond=0).isoformat()
     
-    # 1. SQS 메시지 파싱 및 데이터 매핑
+    # 1. SQS 메시지 파싱 및 데이터 매핑 (파싱 실패 메시지는 부분 실패로 보고)
+    parsed_records = []
+    failed_ids = []
     for record in event.get('Records', []):
-        try:
-            body = json.loads(record['body'])
-            
-            # SQS 메시지 필드 추출
-            summary_date = body.get('summaryDate')
-            
-            # 날짜 처리 (요청하신 대로 분/초 단위 절삭 -> 시간 단위 저장)
-            if not summary_date:
-                summary_date = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0).isoformat()
-
-            # 튜플 형태로 데이터 구성 (execute_values 사용을 위해)
-            # 순서: id, summary_date, pos_reason, neg_reason, pos_kw, neg_kw, created_at
-            row = (
-                str(uuid.uuid4()),
-                summary_date,
-                body.get('positiveReasoning'),
-                body.get('negativeReasoning'),
-                (body.get('positiveKeywords') or "")[:100] if body.get('positiveKeywords') else None,
-                (body.get('negativeKeywords') or "")[:100] if body.get('negativeKeywords') else None,
-                datetime.now(timezone.utc).isoformat()
-            )
-            
-            records_to_insert.append(row)
-
-        except Exception as e:
-            logger.error(f"Error parsing record {record.get('messageId')}: {e}")
-            continue
+        row = parse_record(record, default_summary_date, now_iso)
+        if row:
+            parsed_records.append((record['messageId'], row))
+        else:
+            failed_ids.append(record['messageId'])
 
     # 2. RDS에 일괄 삽입 (Bulk Insert)
-    if records_to_insert:
-        conn = None
+    if parsed_records:
+        conn = get_db_connection()
+        cur = conn.cursor()
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-            
-            logger.info(f"Inserting {len(records_to_insert)} records into article_summary_all...")
-            
-            # [수정] 대상 테이블 article_summary_all
-            # ON CONFLICT DO NOTHING (제약조건 위반 시 Skip)
-            # summary_date 등에 unique constraint가 걸려있어야 합니다.
-            insert_query = """
-                INSERT INTO article_summary_all (
-                    id, 
-                    summary_date, 
-                    positive_reasoning, 
-                    negative_reasoning, 
-                    positive_keywords, 
-                    negative_keywords, 
-                    created_at
-                ) VALUES %s
-                ON CONFLICT DO NOTHING
-            """
-            
-            execute_values(cur, insert_query, records_to_insert)
+            logger.info(f"Inserting {len(parsed_records)} records into article_summary_all...")
+            insert_rows(cur, [row for _, row in parsed_records])
             conn.commit()
-            
             logger.info("Successfully inserted data into RDS (duplicates skipped).")
-            cur.close()
-
         except Exception as e:
-            logger.error(f"Failed to insert data into RDS: {e}")
-            if conn:
-                conn.rollback()
-            # DB 저장 실패 시 에러를 던져서 SQS 메시지가 DLQ로 가거나 재시도되게 함
-            raise e
+            logger.error(f"Failed to bulk insert data into RDS: {e}")
+            conn.rollback()
+            # 일괄 삽입 실패 시 행 단위로 재시도하여 실패한 메시지만 골라냄
+            # (ON CONFLICT DO NOTHING이므로 재전달되어도 중복 저장되지 않음)
+            for message_id, row in parsed_records:
+                try:
+                    insert_rows(cur, [row])
+                    conn.commit()
+                except Exception as row_error:
+                    logger.error(f"Failed to insert record {message_id}: {row_error}")
+                    conn.rollback()
+                    failed_ids.append(message_id)
         finally:
-            if conn:
-                conn.close()
+            cur.close()
 
+    # 실패한 메시지만 SQS에 남겨 재시도/DLQ 처리 (이벤트 소스 매핑의 Report batch item failures 설정 필요)
     return {
         'statusCode': 200,
-        'body': json.dumps(f"Processed {len(records_to_insert)} items (duplicates skipped).")
-    }
\ No newline at end of file
+        'body': json.dumps(f"Processed {len(event.get('Records', [])) - len(failed_ids)} items (duplicates skipped)."),
+        'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed_ids]
+    }
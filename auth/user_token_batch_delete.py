@@ -2,72 +2,186 @@ import os
 import logging
 import time
 import psycopg2
+import psycopg2.errors
 
 # 로깅 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # 설정값
-BATCH_SIZE = 1000  # 한 번에 삭제할 행 개수 (너무 크면 DB 부하, 너무 작으면 느림)
+# 한 번에 삭제할 행 개수는 배치 소요 시간을 보고 조절 (너무 크면 DB 부하, 너무 작으면 왕복 낭비)
+INITIAL_BATCH_SIZE = 500
+MIN_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 10000
+FAST_BATCH_SECONDS = 0.1  # 이보다 빨리 끝나면 배치 크기를 2배로
+SLOW_BATCH_SECONDS = 0.5  # 이보다 오래 걸리면 배치 크기를 절반으로
+THROTTLE_RATIO = 0.25  # 배치 사이 대기 시간 = 직전 배치 소요 시간 x 비율
+MAX_THROTTLE_SECONDS = 0.1
 SAFETY_BUFFER_MS = 5000  # 람다 종료 전 여유 시간 (5초)
+COMMIT_EVERY = 8  # 이 배치 수마다 한 번씩 커밋 (WAL fsync 비용 분산)
+LOCK_TIMEOUT = '500ms'  # Lock 대기가 길어지면 람다 시간을 다 쓰기 전에 쿼리 취소
+STATEMENT_TIMEOUT = '10s'
+
+# Lambda 실행 컨텍스트 간에 DB 연결을 재사용하기 위한 전역 변수
+db_conn = None
+
+def get_db_connection():
+    """DB 연결을 생성하거나, 웜 컨테이너에서는 기존 연결을 재사용합니다."""
+    global db_conn
+    # 기존 연결이 살아있으면 재사용 (유휴 중 서버/프록시에서 끊긴 연결은 SELECT 1로 걸러냄)
+    if db_conn is not None and db_conn.closed == 0:
+        try:
+            with db_conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            db_conn.rollback() # 확인용 트랜잭션 종료
+            return db_conn
+        except psycopg2.Error:
+            logger.warning("Cached DB connection is not usable. Reconnecting.")
+            db_conn.close()
+
+    db_conn = psycopg2.connect(
+        host=os.environ.get('DB_HOST'),
+        user=os.environ.get('DB_USER'),
+        password=os.environ.get('DB_PASSWORD'),
+        dbname=os.environ.get('DB_NAME'),
+        port=os.environ.get('DB_PORT', '5432'),
+        connect_timeout=5,
+        keepalives=1,
+        keepalives_idle=10,
+        keepalives_interval=5,
+        keepalives_count=3
+    )
+
+    with db_conn.cursor() as cur:
+        # 세션 단위 타임아웃: Lock 대기나 느린 DELETE가 람다 타임아웃까지 매달리지 않도록 서버에서 취소
+        cur.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+        cur.execute(f"SET statement_timeout = '{STATEMENT_TIMEOUT}'")
+        # 정리 전용 세션이므로 커밋 시 WAL fsync를 기다리지 않음 (유실되어도 다음 실행에서 다시 삭제됨)
+        cur.execute("SET synchronous_commit = off")
+
+        # [PostgreSQL 전용 쿼리] 삭제 대상의 ctid(물리적 행 위치)를 CTE로 먼저 잡고 삭제
+        # PostgreSQL은 DELETE문에 직접 LIMIT을 쓸 수 없으므로 서브쿼리/CTE 방식이 표준입니다.
+        # - ctid = ANY(ARRAY(...)): PK 인덱스 재조회 없이 Tid Scan으로 바로 행에 접근
+        # - FOR UPDATE SKIP LOCKED: 다른 트랜잭션이 잡고 있는 행은 기다리지 않고 건너뜀
+        # - created_at >= $2: 직전 배치가 끝난 지점부터 인덱스를 탐색 (키셋 페이지네이션)
+        #   아직 VACUUM되지 않은 앞쪽 삭제 행들의 인덱스 항목을 매 배치마다 다시 훑지 않음
+        # 삭제 건수와 마지막 created_at만 한 행으로 돌려받아 다음 배치의 시작점으로 사용
+        # PREPARE는 세션 단위로 유지되므로 새 연결마다 한 번만 실행하여 파싱/플래닝 비용 절감
+        cur.execute("""
+            PREPARE delete_expired_tokens(int, timestamptz) AS
+            WITH expired AS (
+                SELECT ctid
+                FROM user_token
+                WHERE created_at < NOW() - INTERVAL '14 days'
+                  AND created_at >= $2
+                ORDER BY created_at -- created_at 인덱스를 타도록 유도 (오래된 행부터 물리적으로 모아서 삭제)
+                LIMIT $1
+                FOR UPDATE SKIP LOCKED
+            ), deleted AS (
+                DELETE FROM user_token
+                WHERE ctid = ANY(ARRAY(SELECT ctid FROM expired))
+                RETURNING created_at
+            )
+            SELECT count(*), max(created_at) FROM deleted;
+        """)
+    db_conn.commit()
+    return db_conn
 
 def lambda_handler(event, context):
     """
     Expired Token Batch Deletion Handler
     """
+    global db_conn
     conn = None
     total_deleted = 0
-    
+    batch_size = INITIAL_BATCH_SIZE
+    batches_since_commit = 0
+    uncommitted_deleted = 0
+    # 키셋 커서: 이번 호출에서 마지막으로 삭제한 created_at (커밋된 지점도 따로 기억)
+    last_created_at = '-infinity'
+    committed_created_at = last_created_at
+
     try:
-        # 1. DB 연결
-        conn = psycopg2.connect(
-            host=os.environ.get('DB_HOST'),
-            user=os.environ.get('DB_USER'),
-            password=os.environ.get('DB_PASSWORD'),
-            dbname=os.environ.get('DB_NAME'),
-            port=os.environ.get('DB_PORT', '5432'),
-            connect_timeout=5
-        )
-        
+        # 1. DB 연결 (웜 컨테이너에서는 재사용)
+        conn = get_db_connection()
+
         # 2. 배치 삭제 루프 시작
         with conn.cursor() as cur:
             logger.info("Starting batch deletion process...")
-            
+
+            # 삭제 대상이 하나도 없는 경우(대부분의 호출)에는 인덱스 조회 한 번으로 바로 종료
+            cur.execute("SELECT 1 FROM user_token WHERE created_at < NOW() - INTERVAL '14 days' LIMIT 1")
+            if cur.fetchone() is None:
+                conn.rollback() # 조회용 트랜잭션 종료 (연결은 재사용)
+                logger.info("No expired tokens to delete.")
+                return {
+                    'statusCode': 200,
+                    'body': {
+                        'message': 'Batch cleanup complete',
+                        'totalDeleted': 0
+                    }
+                }
+
+            # [안전 장치] 람다 남은 시간이 5초 미만이 되는 시각을 미리 계산해두고 루프에서는 시계만 비교
+            deadline = time.monotonic() + (context.get_remaining_time_in_millis() - SAFETY_BUFFER_MS) / 1000.0
+
             while True:
-                # [안전 장치] 람다 남은 시간이 5초 미만이면 루프 중단 (타임아웃 방지)
-                remaining_time = context.get_remaining_time_in_millis()
-                if remaining_time < SAFETY_BUFFER_MS:
-                    logger.warning(f"Time limit approaching ({remaining_time}ms left). Stopping safely.")
+                # 마감 시각을 넘기면 루프 중단 (타임아웃 방지)
+                started_at = time.monotonic()
+                if started_at > deadline:
+                    logger.warning(f"Time limit approaching (less than {SAFETY_BUFFER_MS}ms left). Stopping safely.")
                     break
 
-                # [PostgreSQL 전용 쿼리] 서브쿼리를 이용해 ID를 먼저 조회하고 삭제
-                # PostgreSQL은 DELETE문에 직접 LIMIT을 쓸 수 없으므로 이 방식이 표준입니다.
-                query = """
-                    DELETE FROM user_token
-                    WHERE id IN (
-                        SELECT id
-                        FROM user_token
-                        WHERE created_at < NOW() - INTERVAL '14 days'
-                        LIMIT %s
-                    );
-                """
-                
-                cur.execute(query, (BATCH_SIZE,))
-                deleted_count = cur.rowcount
-                conn.commit() # 배치마다 커밋하여 DB Lock 해제 및 트랜잭션 로그 비우기
-                
+                try:
+                    cur.execute("EXECUTE delete_expired_tokens(%s, %s)", (batch_size, last_created_at))
+                except psycopg2.errors.QueryCanceled:
+                    # lock_timeout/statement_timeout으로 취소됨: 커밋 전 배치는 롤백되므로 집계에서 빼고,
+                    # 배치 크기를 줄여 다시 시도
+                    conn.rollback()
+                    total_deleted -= uncommitted_deleted
+                    uncommitted_deleted = 0
+                    last_created_at = committed_created_at
+                    batches_since_commit = 0
+                    batch_size = max(batch_size // 2, MIN_BATCH_SIZE)
+                    logger.warning(f"Batch delete timed out. Retrying with batch size {batch_size}.")
+                    continue
+                deleted_count, max_created_at = cur.fetchone()
+                if max_created_at is not None:
+                    last_created_at = max_created_at
+                batches_since_commit += 1
+                uncommitted_deleted += deleted_count
+                # 여러 배치를 묶어 커밋하여 fsync 횟수를 줄이되, Lock 보유 범위는 COMMIT_EVERY 배치로 제한
+                if batches_since_commit >= COMMIT_EVERY:
+                    conn.commit()
+                    batches_since_commit = 0
+                    uncommitted_deleted = 0
+                    committed_created_at = last_created_at
+                elapsed = time.monotonic() - started_at
+
                 total_deleted += deleted_count
-                
+
                 if deleted_count > 0:
                     logger.info(f"Batch deleted: {deleted_count} rows. (Total: {total_deleted})")
-                    # DB 부하 조절을 위해 아주 잠깐 대기 (선택 사항, 0.1초)
-                    time.sleep(0.1)
-                
+
                 # 삭제된 행이 0개거나 배치 사이즈보다 작으면 더 이상 삭제할 게 없다는 뜻
-                if deleted_count < BATCH_SIZE:
+                if deleted_count < batch_size:
                     logger.info("No more rows to delete.")
                     break
-                    
+
+                # 배치 소요 시간이 목표 구간(0.1~0.5초)에 들도록 다음 배치 크기 조절
+                if elapsed < FAST_BATCH_SECONDS:
+                    batch_size = min(batch_size * 2, MAX_BATCH_SIZE)
+                elif elapsed > SLOW_BATCH_SECONDS:
+                    batch_size = max(batch_size // 2, MIN_BATCH_SIZE)
+
+                # DB 부하 조절: 고정 대기 대신 직전 배치 소요 시간에 비례해 짧게 대기 (최대 0.1초)
+                # 남은 시간이 넉넉할 때만 대기하여 마감 직전에는 삭제에 시간을 씀
+                if deadline - (started_at + elapsed) > SAFETY_BUFFER_MS / 1000.0:
+                    time.sleep(min(MAX_THROTTLE_SECONDS, elapsed * THROTTLE_RATIO))
+
+            # 루프 종료 시 아직 커밋되지 않은 배치 반영
+            conn.commit()
+
         return {
             'statusCode': 200,
             'body': {
@@ -78,15 +192,14 @@ def lambda_handler(event, context):
 
     except psycopg2.Error as e:
         logger.error(f"Database error: {e}")
-        if conn:
+        # 오류가 난 연결은 재사용하지 않고 닫음 (다음 호출에서 새로 연결)
+        if conn and conn.closed == 0:
             conn.rollback()
+            conn.close()
+            db_conn = None
+            logger.info("Database connection closed.")
         return {'statusCode': 500, 'body': f"Database error: {str(e)}"}
-        
+
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         return {'statusCode': 500, 'body': f"Error: {str(e)}"}
-        
-    finally:
-        if conn:
-            conn.close()
-            logger.info("Database connection closed.")
\ No newline at end of file
@@ -2,6 +2,8 @@ import math
 
 # 기본 배포 시간 (입력값이 없을 경우)
 DEFAULT_DURATION_HOURS = 9
+# 자주 쓰는 배포 시간(1~24시간)별 시간당 증가분은 임포트 시 미리 계산
+HOURLY_INCREMENT_TABLE = {hours: math.ceil(100 / hours) for hours in range(1, 25)}
 
 def lambda_handler(event, context):
     # Step Functions 시작 시 입력받은 총 배포 시간
@@ -12,7 +14,7 @@ def lambda_handler(event, context):
 
     # 시간당 트래픽 증가분 계산 (소수점 올림 처리)
     # 예: 100 / 6 = 16.66... -> 17
-    hourly_increment = math.ceil(100 / total_duration)
+    hourly_increment = HOURLY_INCREMENT_TABLE.get(total_duration) or math.ceil(100 / total_duration)
 
     print(f"Total duration: {total_duration} hours. Calculated hourly increment: {hourly_increment}%")
 
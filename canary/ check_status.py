@@ -1,9 +1,13 @@
 import boto3
+from botocore.config import Config
 import os
 
+# 웜 컨테이너에서 HTTPS 연결을 재사용하고, 스로틀링은 adaptive 재시도로 흡수
+AWS_CLIENT_CONFIG = Config(tcp_keepalive=True, retries={'mode': 'adaptive', 'total_max_attempts': 5})
+
 # Boto3 클라이언트 초기화
-autoscaling = boto3.client('autoscaling')
-elbv2 = boto3.client('elbv2')
+autoscaling = boto3.client('autoscaling', config=AWS_CLIENT_CONFIG)
+elbv2 = boto3.client('elbv2', config=AWS_CLIENT_CONFIG)
 
 # Lambda 함수의 환경 변수에서 리소스 정보 가져오기
 PROD_ASG_NAME = os.environ['PROD_ASG_NAME']
@@ -20,11 +24,10 @@ def lambda_handler(event, context):
             # Canary 대상 그룹에 등록된 타겟들의 상태를 조회합니다.
             response = elbv2.describe_target_health(TargetGroupArn=CANARY_TG_ARN)
             
-            # 등록된 타겟 중 하나라도 'healthy' 상태이면 성공으로 간주합니다.
-            for target in response.get('TargetHealthDescriptions', []):
-                if target.get('TargetHealth', {}).get('State') == 'healthy':
-                    print("Found at least one healthy canary instance.")
-                    return {"status": "SUCCEEDED"}
+            # 등록된 타겟 중 하나라도 'healthy' 상태이면 성공으로 간주합니다. (첫 healthy 타겟에서 탐색 중단)
+            if any(target['TargetHealth']['State'] == 'healthy' for target in response.get('TargetHealthDescriptions', ())):
+                print("Found at least one healthy canary instance.")
+                return {"status": "SUCCEEDED"}
             
             # healthy 인스턴스가 하나도 없으면 계속 진행 중으로 간주합니다.
             print("No healthy canary instances found yet. Still in progress.")
@@ -37,8 +40,8 @@ def lambda_handler(event, context):
     # --- 2. 프로덕션 ASG의 '인스턴스 새로 고침' 완료 여부를 확인하는 동작 ---
     elif check_type == 'INSTANCE_REFRESH':
         try:
-            # Production ASG에서 진행 중인 인스턴스 새로고침 기록을 조회합니다.
-            response = autoscaling.describe_instance_refreshes(AutoScalingGroupName=PROD_ASG_NAME)
+            # Production ASG에서 진행 중인 인스턴스 새로고침 기록을 조회합니다. (최신순으로 반환되므로 1건만 요청)
+            response = autoscaling.describe_instance_refreshes(AutoScalingGroupName=PROD_ASG_NAME, MaxRecords=1)
             
             if not response.get('InstanceRefreshes'):
                 print("No instance refresh activities found.")
@@ -1,5 +1,7 @@
 import boto3
+from botocore.config import Config
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 SQS_RULE_ARN = os.environ['SQS_RULE_ARN']
 LISTENER_ARN = os.environ['LISTENER_ARN']
@@ -8,9 +10,29 @@ CANARY_TG_ARN = os.environ['CANARY_TG_ARN']
 STATE_MACHINE_ARN = os.environ['STATE_MACHINE_ARN']
 CANARY_ASG_NAME = os.environ['CANARY_ASG_NAME']
 
-autoscaling = boto3.client('autoscaling')
-elbv2 = boto3.client('elbv2')
-sfn = boto3.client('stepfunctions')
+# 웜 컨테이너에서 HTTPS 연결을 재사용하고, 스로틀링은 adaptive 재시도로 흡수
+AWS_CLIENT_CONFIG = Config(tcp_keepalive=True, retries={'mode': 'adaptive', 'total_max_attempts': 5})
+
+autoscaling = boto3.client('autoscaling', config=AWS_CLIENT_CONFIG)
+elbv2 = boto3.client('elbv2', config=AWS_CLIENT_CONFIG)
+sfn = boto3.client('stepfunctions', config=AWS_CLIENT_CONFIG)
+
+def terminate_canary_instance():
+    """카나리 ASG의 '원하는 용량'을 0으로 설정하여 카나리 인스턴스 자동 종료"""
+    print(f"Terminating canary instance by setting DesiredCapacity of {CANARY_ASG_NAME} to 0.")
+    autoscaling.update_auto_scaling_group(
+        AutoScalingGroupName=CANARY_ASG_NAME,
+        DesiredCapacity=0
+    )
+    print("Canary instance termination initiated.")
+
+def stop_running_deployment():
+    """현재 실행 중인 Step Functions 워크플로우를 찾아 강제 중지"""
+    executions = sfn.list_executions(stateMachineArn=STATE_MACHINE_ARN, statusFilter='RUNNING')
+    if executions['executions']:
+        execution_arn = executions['executions'][0]['executionArn']
+        sfn.stop_execution(executionArn=execution_arn, error='RollbackTriggered', cause='CloudWatch alarm was triggered.')
+        print(f"Successfully stopped Step Functions execution: {execution_arn}")
 
 def lambda_handler(event, context):
     print("ALARM DETECTED! Initiating emergency rollback.")
@@ -35,19 +57,13 @@ def lambda_handler(event, context):
         }]
     )
     
-    # 2. 카나리 ASG의 '원하는 용량'을 0으로 설정하여 카나리 인스턴스 자동 종료
-    print(f"Terminating canary instance by setting DesiredCapacity of {CANARY_ASG_NAME} to 0.")
-    autoscaling.update_auto_scaling_group(
-        AutoScalingGroupName=CANARY_ASG_NAME,
-        DesiredCapacity=0
-    )
-    print("Canary instance termination initiated.")
-
-    # 3. 현재 실행 중인 Step Functions 워크플로우를 찾아 강제 중지
-    executions = sfn.list_executions(stateMachineArn=STATE_MACHINE_ARN, statusFilter='RUNNING')
-    if executions['executions']:
-        execution_arn = executions['executions'][0]['executionArn']
-        sfn.stop_execution(executionArn=execution_arn, error='RollbackTriggered', cause='CloudWatch alarm was triggered.')
-        print(f"Successfully stopped Step Functions execution: {execution_arn}")
+    # 2~3. 트래픽 복구 이후의 정리 작업(카나리 종료, 워크플로우 중지)은 서로 독립적이므로 동시에 실행
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(terminate_canary_instance),
+            executor.submit(stop_running_deployment)
+        ]
+        for future in futures:
+            future.result() # 작업 중 발생한 예외를 그대로 전파
         
     return "Emergency rollback and cleanup completed."
\ No newline at end of file
@@ -1,14 +1,10 @@
-import json
-
-def lambda_handler(event, context):
-    # TODO implement
-    return {
-        'statusCode': 200,
-        'body': json.dumps('Hello from Lambda!')
-    }
 import boto3
+from botocore.config import Config
+
+# 웜 컨테이너에서 HTTPS 연결을 재사용하고, 스로틀링은 adaptive 재시도로 흡수
+AWS_CLIENT_CONFIG = Config(tcp_keepalive=True, retries={'mode': 'adaptive', 'total_max_attempts': 5})
 
-codedeploy = boto3.client('codedeploy')
+codedeploy = boto3.client('codedeploy', config=AWS_CLIENT_CONFIG)
 
 def lambda_handler(event, context):
     deployment_id = event['detail']['deploymentId'] # EventBridge에서 전달된 원본 이벤트 정보 사용
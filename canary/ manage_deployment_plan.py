@@ -1,9 +1,11 @@
 import math
 DEFAULT_DURATION = 9
+# 자주 쓰는 배포 시간(1~24시간)별 시간당 증가분은 임포트 시 미리 계산
+HOURLY_INCREMENT_TABLE = {hours: math.ceil(100 / hours) for hours in range(1, 25)}
 
 def lambda_handler(event, context):
     duration = event.get('total_duration_hours', DEFAULT_DURATION)
-    increment = math.ceil(100 / duration) if duration > 0 else 100
+    increment = (HOURLY_INCREMENT_TABLE.get(duration) or math.ceil(100 / duration)) if duration > 0 else 100
     
     return {
         "plan": {
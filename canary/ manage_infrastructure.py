@@ -1,17 +1,45 @@
 import boto3
+from botocore.config import Config
 import os
-import json
 import base64
+import re
+import time
+
+# 웜 컨테이너에서 HTTPS 연결을 재사용하고, 스로틀링은 adaptive 재시도로 흡수
+AWS_CLIENT_CONFIG = Config(tcp_keepalive=True, retries={'mode': 'adaptive', 'total_max_attempts': 5})
 
 # Boto3 클라이언트 초기화
-ec2 = boto3.client('ec2')
-autoscaling = boto3.client('autoscaling')
+ec2 = boto3.client('ec2', config=AWS_CLIENT_CONFIG)
+autoscaling = boto3.client('autoscaling', config=AWS_CLIENT_CONFIG)
 
 LIVE_LAUNCH_TEMPLATE_ID = os.environ['LIVE_LAUNCH_TEMPLATE_ID']
 CANARY_LAUNCH_TEMPLATE_ID = os.environ['CANARY_LAUNCH_TEMPLATE_ID']
 PROD_ASG_NAME = os.environ.get('PROD_ASG_NAME')
 CANARY_ASG_NAME = os.environ.get('CANARY_ASG_NAME')
 
+# live-template의 최신 버전 데이터는 웜 컨테이너에서 TTL 동안 재조회하지 않음
+LAUNCH_TEMPLATE_CACHE_TTL_SECONDS = 300
+
+# UserData에서 'export SPRING_APP_IMAGE=...' 라인을 찾는 정규식 (디코딩 없이 bytes에 바로 적용)
+SPRING_APP_IMAGE_LINE_RE = re.compile(rb'^[ \t]*export SPRING_APP_IMAGE=[^\r\n]*', re.MULTILINE)
+
+# 호출 간 재사용되는 launch template 데이터 캐시
+_launch_template_cache = {'data': None, 'fetched_at': 0.0}
+
+def get_latest_live_template_data():
+    """live-template의 $Latest 버전 LaunchTemplateData를 조회합니다. (TTL 캐시 사용)"""
+    now = time.monotonic()
+    if _launch_template_cache['data'] is not None and now - _launch_template_cache['fetched_at'] < LAUNCH_TEMPLATE_CACHE_TTL_SECONDS:
+        return _launch_template_cache['data']
+
+    data = ec2.describe_launch_template_versions(
+        LaunchTemplateId=LIVE_LAUNCH_TEMPLATE_ID,
+        Versions=['$Latest']
+    )['LaunchTemplateVersions'][0]['LaunchTemplateData']
+    _launch_template_cache['data'] = data
+    _launch_template_cache['fetched_at'] = now
+    return data
+
 def lambda_handler(event, context):
     action = event.get('action')
     
@@ -47,36 +75,23 @@ def lambda_handler(event, context):
         
         try:
             # 1. live-template의 최신 User Data 가져오기
-            latest_version_data = ec2.describe_launch_template_versions(
-                LaunchTemplateId=LIVE_LAUNCH_TEMPLATE_ID,
-                Versions=['$Latest']
-            )['LaunchTemplateVersions'][0]['LaunchTemplateData']
+            latest_version_data = get_latest_live_template_data()
 
             base64_user_data = latest_version_data.get('UserData')
             if not base64_user_data:
                  raise ValueError("Could not find UserData in the latest Launch Template version.")
 
-            decoded_user_data = base64.b64decode(base64_user_data).decode('utf-8')
-
-            # 2. 플레이스홀더(또는 이전 태그)를 새 이미지 태그로 교체
-            #    정규식 대신 단순 replace 사용 (더 안정적일 수 있음)
-            #    'export SPRING_APP_IMAGE="..."' 라인을 찾아 교체
-            lines = decoded_user_data.splitlines()
-            modified_lines = []
-            replaced = False
-            for line in lines:
-                if line.strip().startswith('export SPRING_APP_IMAGE='):
-                    modified_lines.append(f'export SPRING_APP_IMAGE="{image_tag}"')
-                    replaced = True
-                else:
-                    modified_lines.append(line)
-
-            if not replaced:
+            decoded_user_data = base64.b64decode(base64_user_data)
+
+            # 2. 'export SPRING_APP_IMAGE="..."' 라인(플레이스홀더 또는 이전 태그)을 새 이미지 태그로 교체
+            #    bytes 그대로 정규식 치환하여 라인 분리/재결합과 utf-8 디코딩/인코딩을 생략
+            new_image_line = f'export SPRING_APP_IMAGE="{image_tag}"'.encode('utf-8')
+            modified_user_data, replaced_count = SPRING_APP_IMAGE_LINE_RE.subn(lambda _: new_image_line, decoded_user_data)
+
+            if not replaced_count:
                 raise ValueError("Could not find 'export SPRING_APP_IMAGE=...' line in UserData.")
 
-            # 2. 플레이스홀더를 새 이미지 태그로 교체합니다.
-            modified_user_data = "\n".join(modified_lines)
-            new_base64_user_data = base64.b64encode(modified_user_data.encode('utf-8')).decode('utf-8')
+            new_base64_user_data = base64.b64encode(modified_user_data).decode('utf-8')
 
             # 3. 수정된 User Data로 live-template의 새 버전을 생성합니다.
             new_version_response = ec2.create_launch_template_version(
@@ -86,6 +101,7 @@ def lambda_handler(event, context):
                 LaunchTemplateData={'UserData': new_base64_user_data}
             )
             new_version_number = new_version_response['LaunchTemplateVersion']['VersionNumber']
+            _launch_template_cache['data'] = None # 새 버전이 $Latest가 되었으므로 캐시 무효화
             print(f"Created new Live Launch Template Version: {new_version_number}")
 
             # 4. 방금 만든 새 버전을 live-template의 기본값으로 설정합니다.
@@ -1,8 +1,12 @@
 import boto3
+from botocore.config import Config
 import os
 
+# 웜 컨테이너에서 HTTPS 연결을 재사용하고, 스로틀링은 adaptive 재시도로 흡수
+AWS_CLIENT_CONFIG = Config(tcp_keepalive=True, retries={'mode': 'adaptive', 'total_max_attempts': 5})
+
 # Boto3 클라이언트 초기화
-elbv2 = boto3.client('elbv2')
+elbv2 = boto3.client('elbv2', config=AWS_CLIENT_CONFIG)
 
 # Lambda 함수의 환경 변수에서 리소스 ARN 가져오기
 LISTENER_ARN = os.environ['LISTENER_ARN']
@@ -1,11 +1,26 @@
 import os
+import time
 import boto3
+from botocore.config import Config
 import random
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 
-elbv2_client = boto3.client('elbv2')
-sqs_client = boto3.client('sqs')
+try:
+    import orjson
+except ImportError: # orjson이 Lambda Layer에 없는 환경에서는 표준 json 사용
+    orjson = None
+
+# 병렬 배치 전송 시 커넥션 풀이 부족하지 않도록 하고, 웜 컨테이너에서 TCP/TLS 연결을 재사용
+AWS_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    tcp_keepalive=True
+)
+elbv2_client = boto3.client('elbv2', config=AWS_CLIENT_CONFIG)
+sqs_client = boto3.client('sqs', config=AWS_CLIENT_CONFIG)
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
@@ -14,66 +29,102 @@ LIVE_TARGET_GROUP_ARN = os.environ.get('LIVE_TARGET_GROUP_ARN')
 CANARY_TARGET_GROUP_ARN = os.environ.get('CANARY_TARGET_GROUP_ARN')
 LIVE_SQS_QUEUE_URL = os.environ.get('LIVE_SQS_QUEUE_URL')
 CANARY_SQS_QUEUE_URL = os.environ.get('CANARY_SQS_QUEUE_URL')
+# 배포 상태/가중치는 자주 바뀌지 않으므로 웜 컨테이너에서는 TTL(초) 동안 ALB를 재조회하지 않음
+ALB_CACHE_TTL_SECONDS = int(os.environ.get('ALB_CACHE_TTL', '30'))
+
+# 호출 간 재사용되는 (is_canary_active, live_weight, canary_weight) 캐시
+_alb_cache = {'value': None, 'fetched_at': 0.0}
+
+# SQS 배치 전송 동시 실행 수 (Live/Canary 큐의 모든 10개 단위 배치가 같은 풀을 공유)
+SQS_SEND_MAX_WORKERS = 8
+# 웜 컨테이너에서 스레드(및 SQS 커넥션)를 재사용하기 위해 모듈 레벨에 생성
+_send_executor = ThreadPoolExecutor(max_workers=SQS_SEND_MAX_WORKERS)
+
 
+def to_json(obj):
+    """SQS MessageBody용 JSON 문자열을 생성합니다. (orjson 우선 사용, 공백 없는 직렬화)"""
+    if orjson:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+def _fetch_deployment_status_and_weights():
+    """ALB 리스너 설정을 조회하여 (카나리 활성 여부, Live 가중치, Canary 가중치)를 반환합니다."""
+    response = elbv2_client.describe_listeners(ListenerArns=[ALB_LISTENER_ARN])
+    forward_config = response['Listeners'][0]['DefaultActions'][0].get('ForwardConfig')
+    if not forward_config:
+        return False, 100, 0
+        
+    target_groups = forward_config.get('TargetGroups', [])
+    is_canary_active = False
+    if len(target_groups) > 1 and any(tg['TargetGroupArn'] == CANARY_TARGET_GROUP_ARN for tg in target_groups):
+        is_canary_active = True
+    
+    if not is_canary_active:
+        return False, 100, 0
+    
+    live_weight, canary_weight = 0, 0
+    for tg in target_groups:
+        if tg['TargetGroupArn'] == LIVE_TARGET_GROUP_ARN:
+            live_weight = tg.get('Weight', 0)
+        elif tg['TargetGroupArn'] == CANARY_TARGET_GROUP_ARN:
+            canary_weight = tg.get('Weight', 0)
+    
+    logger.info(f"Dynamic Check -> Canary Active: True, Weights: Live={live_weight}, Canary={canary_weight}")
+    return True, live_weight, canary_weight
 
 def get_deployment_status_and_weights():
-    """ALB 리스너 설정을 동적으로 확인하여 배포 상태와 트래픽 가중치를 반환합니다."""
+    """ALB 리스너 설정을 동적으로 확인하여 배포 상태와 트래픽 가중치를 반환합니다. (TTL 캐시 사용)"""
+    now = time.monotonic()
+    if _alb_cache['value'] is not None and now - _alb_cache['fetched_at'] < ALB_CACHE_TTL_SECONDS:
+        return _alb_cache['value']
+
     try:
-        response = elbv2_client.describe_listeners(ListenerArns=[ALB_LISTENER_ARN])
-        forward_config = response['Listeners'][0]['DefaultActions'][0].get('ForwardConfig')
-        if not forward_config:
-            return False, 100, 0
-            
-        target_groups = forward_config.get('TargetGroups', [])
-        is_canary_active = False
-        if len(target_groups) > 1 and any(tg['TargetGroupArn'] == CANARY_TARGET_GROUP_ARN for tg in target_groups):
-            is_canary_active = True
-        
-        if not is_canary_active:
-            return False, 100, 0
-        
-        live_weight, canary_weight = 0, 0
-        for tg in target_groups:
-            if tg['TargetGroupArn'] == LIVE_TARGET_GROUP_ARN:
-                live_weight = tg.get('Weight', 0)
-            elif tg['TargetGroupArn'] == CANARY_TARGET_GROUP_ARN:
-                canary_weight = tg.get('Weight', 0)
-        
-        logger.info(f"Dynamic Check -> Canary Active: True, Weights: Live={live_weight}, Canary={canary_weight}")
-        return True, live_weight, canary_weight
+        value = _fetch_deployment_status_and_weights()
     except Exception as e:
+        # 조회 실패 시 직전 캐시 값을 유지하여 Live/Canary 분배가 흔들리지 않게 함 (캐시가 없으면 Live로)
+        if _alb_cache['value'] is not None:
+            logger.error(f"Failed to get ALB listener rules, keeping cached weights: {e}", exc_info=True)
+            return _alb_cache['value']
         logger.error(f"Failed to get ALB listener rules, defaulting to Live: {e}", exc_info=True)
         return False, 100, 0
 
-def _send_batch_to_sqs(queue_url: str, messages: list):
-    """주어진 메시지 리스트를 SQS 큐에 10개씩 묶어 일괄 전송합니다."""
-    if not messages:
-        return
+    _alb_cache['value'] = value
+    _alb_cache['fetched_at'] = now
+    return value
+
+def _send_chunk_to_sqs(queue_url: str, chunk: list):
+    """최대 10개의 메시지를 SQS 큐에 한 번의 send_message_batch로 전송합니다."""
+    # 각 메시지는 'id'와 'body' 키를 가져야 합니다. (본문은 공백 없는 JSON으로 직렬화)
+    entries = [{'Id': msg['id'], 'MessageBody': to_json(msg['body'])} for msg in chunk]
+    
+    try:
+        response = sqs_client.send_message_batch(
+            QueueUrl=queue_url,
+            Entries=entries
+        )
+        # 성공/실패 여부 로깅
+        if 'Successful' in response:
+            logger.info(f"Successfully sent {len(response['Successful'])} messages to {queue_url}")
+        if 'Failed' in response and response['Failed']:
+            logger.error(f"Failed to send {len(response['Failed'])} messages to {queue_url}: {response['Failed']}")
+    except Exception as e:
+        logger.error(f"Exception during send_message_batch to {queue_url}: {e}", exc_info=True)
+        raise e
 
+def _send_batch_to_sqs(queue_url: str, messages: list):
+    """주어진 메시지 리스트를 10개씩 묶어 전송 풀에 제출하고, 제출된 future 목록을 반환합니다."""
     # SQS SendMessageBatch API는 최대 10개의 메시지를 한 번에 보낼 수 있습니다.
-    for i in range(0, len(messages), 10):
-        chunk = messages[i:i + 10]
-        entries = []
-        for msg in chunk:
-            # 각 메시지는 'id'와 'body' 키를 가져야 합니다.
-            entries.append({
-                'Id': msg['id'],
-                'MessageBody': json.dumps(msg['body'])
-            })
-        
-        try:
-            response = sqs_client.send_message_batch(
-                QueueUrl=queue_url,
-                Entries=entries
-            )
-            # 성공/실패 여부 로깅
-            if 'Successful' in response:
-                logger.info(f"Successfully sent {len(response['Successful'])} messages to {queue_url}")
-            if 'Failed' in response and response['Failed']:
-                logger.error(f"Failed to send {len(response['Failed'])} messages to {queue_url}: {response['Failed']}")
-        except Exception as e:
-            logger.error(f"Exception during send_message_batch to {queue_url}: {e}", exc_info=True)
-            raise e
+    # 인덱스 슬라이싱 대신 이터레이터에서 10개씩 꺼내 배치를 구성
+    futures = []
+    iterator = iter(messages)
+    while chunk := list(islice(iterator, 10)):
+        futures.append(_send_executor.submit(_send_chunk_to_sqs, queue_url, chunk))
+    return futures
+
+def _wait_for_sends(futures: list):
+    """제출된 전송 작업이 모두 끝날 때까지 기다리고, 전송 중 발생한 예외는 그대로 전파합니다."""
+    for future in as_completed(futures):
+        future.result()
 
 def send_prediction_messages(messages: list):
     """
@@ -89,7 +140,7 @@ def send_prediction_messages(messages: list):
 
     if not is_canary_active:
         logger.info(f"Canary not active. Sending all {len(messages)} messages to the Live queue.")
-        _send_batch_to_sqs(LIVE_SQS_QUEUE_URL, messages)
+        _wait_for_sends(_send_batch_to_sqs(LIVE_SQS_QUEUE_URL, messages))
         return
 
     # ✅ 핵심 로직: 트래픽 비율에 따라 메시지 리스트를 분배
@@ -98,23 +149,25 @@ def send_prediction_messages(messages: list):
     
     if total_weight == 0: # 비정상 상태일 경우 안전하게 라이브로 모두 전송
         logger.warning("Total traffic weight is 0. Sending all messages to the Live queue.")
-        _send_batch_to_sqs(LIVE_SQS_QUEUE_URL, messages)
+        _wait_for_sends(_send_batch_to_sqs(LIVE_SQS_QUEUE_URL, messages))
         return
         
-    # 카나리로 보낼 메시지 개수 계산 (반올림하여 정수화)
-    num_canary = round(total_messages * (canary_weight / total_weight))
-    
-    # 메시지를 무작위로 섞어 특정 메시지 그룹이 항상 카나리로 가는 것을 방지
-    random.shuffle(messages)
-    
-    canary_messages = messages[:num_canary]
-    live_messages = messages[num_canary:]
+    # 메시지마다 독립적으로 카나리 여부를 뽑아 한 번의 순회로 분배 (전체 셔플/슬라이스 복사 없음)
+    # 카나리 개수는 가중치 비율을 기댓값으로 하는 이항분포를 따름
+    canary_ratio = canary_weight / total_weight
+    rand = random.random
+    live_messages = []
+    canary_messages = []
+    for msg in messages:
+        (canary_messages if rand() < canary_ratio else live_messages).append(msg)
 
     logger.info(
         f"Distributing {total_messages} messages -> "
         f"Live: {len(live_messages)}, Canary: {len(canary_messages)}"
     )
 
-    # 각 큐로 일괄 전송
-    _send_batch_to_sqs(LIVE_SQS_QUEUE_URL, live_messages)
-    _send_batch_to_sqs(CANARY_SQS_QUEUE_URL, canary_messages)
\ No newline at end of file
+    # 각 큐로 일괄 전송 (Live/Canary 배치를 모두 동시에 전송)
+    _wait_for_sends(
+        _send_batch_to_sqs(LIVE_SQS_QUEUE_URL, live_messages)
+        + _send_batch_to_sqs(CANARY_SQS_QUEUE_URL, canary_messages)
+    )
\ No newline at end of file
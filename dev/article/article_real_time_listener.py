@@ -1,10 +1,12 @@
 import os
 import json
 import logging
+import time
 from datetime import datetime
 from pytz import timezone
 from supabase import create_client, Client
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 # 로거 설정
 logger = logging.getLogger()
@@ -14,6 +16,15 @@ SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# ticker 테이블은 거의 바뀌지 않으므로 웜 컨테이너에서는 TTL 동안 코드별 조회 결과를 재사용
+TICKER_CACHE_TTL_SECONDS = 900
+
+# 호출 간 재사용되는 ticker 코드 -> (id, short_company_name) 캐시
+_ticker_id_cache = {'data': {}, 'fetched_at': 0.0}
+
+# 아티클 저장(Supabase 요청)을 동시에 처리할 스레드 수 (SQS 배치 크기와 동일)
+ARTICLE_PROCESS_MAX_WORKERS = 10
+
 
 def lambda_handler(event, context):
     """
@@ -27,7 +38,8 @@ def lambda_handler(event, context):
 
     logger.info(f"Received {len(records)} messages to process.")
 
-    # 각 메시지를 순회하며 처리합니다.
+    # 1. 메시지 본문을 먼저 파싱하여 처리할 아티클만 추립니다.
+    articles = []
     for record in records:
         message_id = record.get('messageId')
         try:
@@ -43,29 +55,57 @@ def lambda_handler(event, context):
                 logger.warning(f"Message with id {message_id} does not contain 'article' data. Skipping.")
                 continue
 
-            article_id = save_article(article_data)
-            
-            # unique 제약 조건을 통과한 경우에만, article_ticker 데이터 삽입을 허용함
-            if article_id:
-                logger.info(f"Article processed for messageId {message_id}. Article ID: {article_id}")
-                insights = article_data.get('insights', [])
-                if insights:
-                    ticker_codes = [i['ticker_code'] for i in insights]
-                    ticker_id_map = get_ticker_id_map(ticker_codes)
-                    save_article_tickers(article_id, article_data, insights, ticker_id_map)
-                else:
-                    logger.info(f"No insights found for article in messageId {message_id}.")
-            
+            articles.append((message_id, article_data))
+
         except Exception as e:
-            # 특정 메시지 처리 중 발생하는 모든 예외 처리
-            logger.error(f"An error occurred while processing messageId {message_id}: {e}", exc_info=True)
+            logger.error(f"An error occurred while parsing messageId {message_id}: {e}", exc_info=True)
             raise e # 예외를 다시 발생시켜 SQS 재처리를 유도
 
+    # 2. 배치 전체의 ticker 코드를 모아 Ticker ID 맵을 한 번만 조회합니다.
+    all_ticker_codes = {
+        insight['ticker_code']
+        for _, article_data in articles
+        for insight in (article_data.get('insights') or [])
+    }
+    ticker_id_map = get_ticker_id_map(list(all_ticker_codes))
+
+    # 3. 각 아티클을 스레드 풀에서 동시에 저장합니다. (아티클 간 Supabase 요청은 서로 독립적)
+    with ThreadPoolExecutor(max_workers=ARTICLE_PROCESS_MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(process_article, message_id, article_data, ticker_id_map): message_id
+            for message_id, article_data in articles
+        }
+
+    # 하나라도 실패했다면 모든 결과를 로깅한 뒤 예외를 다시 발생시켜 SQS 재처리를 유도
+    errors = []
+    for future, message_id in futures.items():
+        error = future.exception()
+        if error:
+            logger.error(f"An error occurred while processing messageId {message_id}: {error}", exc_info=error)
+            errors.append(error)
+    if errors:
+        raise errors[0]
+
     return {
         'statusCode': 200,
         'body': json.dumps({'message': f'Successfully processed {len(records)} messages.'})
     }
     
+def process_article(message_id: str, article_data: dict, ticker_id_map: dict):
+    """
+    Article 하나를 저장하고, 새로 저장된 경우에만 연관 Ticker 정보를 저장합니다.
+    """
+    article_id = save_article(article_data)
+    
+    # unique 제약 조건을 통과한 경우에만, article_ticker 데이터 삽입을 허용함
+    if article_id:
+        logger.info(f"Article processed for messageId {message_id}. Article ID: {article_id}")
+        insights = article_data.get('insights', [])
+        if insights:
+            save_article_tickers(article_id, article_data, insights, ticker_id_map)
+        else:
+            logger.info(f"No insights found for article in messageId {message_id}.")
+
 def save_article(article: dict) -> str:
     """
     Article을 DB에 저장합니다. 이미 존재하면 건너뛰고 ID를 반환합니다.
@@ -103,15 +143,24 @@ def save_article(article: dict) -> str:
 def get_ticker_id_map(ticker_codes: list) -> dict:
     """
     Ticker 코드 리스트를 받아 Ticker ID(UUID) 맵을 반환합니다.
+    웜 컨테이너에서는 TTL 동안 캐시된 코드는 재조회하지 않고, 캐시에 없는 코드만 조회합니다.
     """
     if not ticker_codes:
         return {}
 
-    response = supabase.table('ticker').select('id, code, short_company_name').in_('code', ticker_codes).execute()
-    
-    if response.data:
-        return {item['code']: {item['id'], item['short_company_name']} for item in response.data}
-    return {}
+    now = time.monotonic()
+    if now - _ticker_id_cache['fetched_at'] >= TICKER_CACHE_TTL_SECONDS:
+        _ticker_id_cache['data'] = {}
+        _ticker_id_cache['fetched_at'] = now
+    cached = _ticker_id_cache['data']
+
+    missing_codes = [code for code in ticker_codes if code not in cached]
+    if missing_codes:
+        response = supabase.table('ticker').select('id, code, short_company_name').in_('code', missing_codes).execute()
+        if response.data:
+            cached.update({item['code']: (item['id'], item['short_company_name']) for item in response.data})
+
+    return {code: cached[code] for code in ticker_codes if code in cached}
 
 
 def save_article_tickers(article_id: str, article_data: dict, insights: list, ticker_id_map: dict):
@@ -123,7 +172,7 @@ def save_article_tickers(article_id: str, article_data: dict, insights: list, ti
 
     for insight in insights:
         ticker_code = insight['ticker_code']
-        ticker_id, short_company_name = ticker_id_map.get(insight['ticker_code'])
+        ticker_id, short_company_name = ticker_id_map.get(ticker_code, (None, None))
 
         if not ticker_id:
             logger.warning(f"Ticker ID for code '{ticker_code}' not found. Skipping.")
@@ -1,5 +1,7 @@
 import os
 import json
+import gzip
+import base64
 import logging
 import psycopg2
 import psycopg2.extras
@@ -17,6 +19,7 @@ DB_PORT = os.environ.get('DB_PORT')
 DB_NAME = os.environ.get('DB_NAME')
 DB_USER = os.environ.get('DB_USER')
 DB_PASSWORD = os.environ.get('DB_PASSWORD')
+SEOUL_TZ = timezone("Asia/Seoul")
 
 # Lambda 실행 컨텍스트 간에 DB 연결을 재사용하기 위한 전역 변수
 db_conn = None
@@ -41,6 +44,14 @@ def get_db_connection():
             raise e
     return db_conn
 
+def parse_message_body(record):
+    """SQS 레코드 본문을 파싱합니다. 'encoding' 속성이 gzip+base64이면 압축을 해제한 뒤 파싱합니다."""
+    body = record.get('body', '{}')
+    encoding = record.get('messageAttributes', {}).get('encoding', {}).get('stringValue')
+    if encoding == 'gzip+base64':
+        body = gzip.decompress(base64.b64decode(body)).decode('utf-8')
+    return json.loads(body)
+
 def lambda_handler(event, context):
     """SQS 메시지를 받아 RDS DB에 데이터를 저장합니다."""
     try:
@@ -55,20 +66,21 @@ def lambda_handler(event, context):
         return {'statusCode': 200, 'body': json.dumps('No records to process.')}
 
     logger.info(f"Received {len(records)} messages to process.")
+    created_at = datetime.now(SEOUL_TZ).isoformat() # 배치 내 모든 레코드가 동일한 생성 시각 사용
 
     for record in records:
         message_id = record.get('messageId')
         try:
             # 각 메시지 처리를 위한 트랜잭션 시작
             with conn.cursor() as cursor:
-                message_body = json.loads(record.get('body', '{}'))
+                message_body = parse_message_body(record)
                 article_data = message_body.get('article')
                 if not article_data:
                     logger.warning(f"Message {message_id} is missing 'article' data. Skipping.")
                     continue
 
                 # 1. Article 저장 시도
-                article_id = save_article(cursor, article_data)
+                article_id = save_article(cursor, article_data, created_at)
                 
                 # 2. 신규 Article인 경우에만 Ticker 정보 저장
                 if article_id:
@@ -77,7 +89,7 @@ def lambda_handler(event, context):
                     if insights:
                         ticker_codes = [i['ticker_code'] for i in insights]
                         ticker_id_map = get_ticker_id_map(cursor, ticker_codes)
-                        save_article_tickers(cursor, article_id, article_data, insights, ticker_id_map)
+                        save_article_tickers(cursor, article_id, article_data, insights, ticker_id_map, created_at)
 
             # 메시지 처리가 성공하면 트랜잭션 커밋
             conn.commit()
@@ -94,16 +106,15 @@ def lambda_handler(event, context):
 
 # --- 비즈니스 로직 함수들은 변경할 필요가 없습니다 ---
 
-def save_article(cursor, article: dict):
+def save_article(cursor, article: dict, created_at: str):
     """DB 함수(RPC)를 호출하여 Article을 저장하고, 신규 생성 시에만 ID를 반환합니다."""
-    seoul_time = datetime.now(timezone("Asia/Seoul"))
     article_params = {
         'published_date': article.get('published_date'),
         'title': article.get('title'), 'title_kr': article.get('title_kr'), 
         'description': article.get('description'), 'description_kr': article.get('description_kr'),
         'article_url': article.get('article_url'), 'thumbnail_url': article.get('thumbnail_url'),
         'author': article.get('author'), 'distinct_id': article.get('distinct_id'),
-        'tickers': article.get('tickers'), 'created_at': seoul_time.isoformat()
+        'tickers': article.get('tickers'), 'created_at': created_at
     }
     
     cursor.execute("SELECT insert_article_if_not_exists(%s);", (json.dumps(article_params),))
@@ -121,13 +132,12 @@ def get_ticker_id_map(cursor, ticker_codes: list) -> dict:
     cursor.execute("SELECT id, code, short_company_name FROM ticker WHERE code = ANY(%s);", (ticker_codes,))
     return {code: (ticker_id, short_company_name) for ticker_id, code, short_company_name in cursor.fetchall()}
 
-def save_article_tickers(cursor, article_id: str, article_data: dict, insights: list, ticker_id_map: dict):
+def save_article_tickers(cursor, article_id: str, article_data: dict, insights: list, ticker_id_map: dict, created_at: str):
     """Article Ticker 정보들을 Batch Insert 합니다."""
-    seoul_time = datetime.now(timezone("Asia/Seoul"))
     to_insert = []
     for insight in insights:
         ticker_code = insight['ticker_code']
-        ticker_id, short_company_name = ticker_id_map.get(insight['ticker_code'])
+        ticker_id, short_company_name = ticker_id_map.get(ticker_code, (None, None))
         
         if not ticker_id:
             logger.warning(f"Ticker ID for code '{ticker_code}' not found. Skipping.")
@@ -136,7 +146,7 @@ def save_article_tickers(cursor, article_id: str, article_data: dict, insights:
             str(uuid.uuid4()), article_id, ticker_id, ticker_code, article_data['title'], article_data['title_kr'],
             insight['sentiment'], insight['reasoning'], insight['reasoning_kr'],
             article_data['published_date'], 
-            short_company_name, seoul_time.isoformat()
+            short_company_name, created_at
         ))
 
     if not to_insert:
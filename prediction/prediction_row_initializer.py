@@ -16,6 +16,7 @@ POLYGON_API_KEY = os.environ.get('POLYGON_API_KEY')
 PREDICTION_SQS_QUEUE_URL = os.environ.get('PREDICTION_SQS_QUEUE_URL')
 SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
+SEOUL_TZ = pytz.timezone("Asia/Seoul")
 
 # 클라이언트는 핸들러 함수 밖에 선언하여 재사용 (성능 최적화)
 sqs_client = boto3.client('sqs')
@@ -274,6 +275,7 @@ def lambda_handler(event, context):
             } for ticker in tickers 
         }
 
+        created_at = datetime.now(SEOUL_TZ).isoformat() # 한 번의 실행에서 생성된 메시지는 동일한 생성 시각 사용
         messages_to_send = []
         for ticker_id in ticker_info_map.keys():
             code = ticker_info_map.get(ticker_id, {}).get('code')
@@ -302,7 +304,7 @@ def lambda_handler(event, context):
                     'todayHigh': price_data.get('todayHigh'),
                     'todayLow': price_data.get('todayLow'),
                     'yesterdayClose' : price_data.get('yesterdayClose'),
-                    'createdAt': datetime.now(pytz.timezone("Asia/Seoul")).isoformat()
+                    'createdAt': created_at
                 }
             }
             